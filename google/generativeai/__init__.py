@@ -61,6 +61,12 @@ from google.generativeai.files import delete_file
 from google.generativeai.generative_models import GenerativeModel
 from google.generativeai.generative_models import ChatSession
 
+from google.generativeai.batching import AsyncBatcher
+
+from google.generativeai.response_cache import ResponseCache
+from google.generativeai.response_cache import SemanticCache
+from google.generativeai.response_cache import set_llm_cache
+
 from google.generativeai.text import generate_text
 from google.generativeai.text import generate_embeddings
 from google.generativeai.text import count_text_tokens
@@ -87,7 +93,9 @@ __version__ = version.__version__
 del discuss
 del embedding
 del files
+del batching
 del generative_models
+del response_cache
 del text
 del models
 del client
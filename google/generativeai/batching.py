@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Coalesces concurrent `GenerativeModel.generate_content_async` calls."""
+from __future__ import annotations
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable
+
+from google.ai import generativelanguage as glm
+
+__all__ = ["AsyncBatcher"]
+
+_Call = Callable[[], Awaitable[glm.GenerateContentResponse]]
+
+
+class AsyncBatcher:
+    """Collects concurrent `generate_content_async` requests and dispatches them together.
+
+    Requests arriving within `max_wait_ms` of each other are gathered into a batch of up to
+    `max_batch` requests. Identical requests in the same batch are only sent once, and every
+    caller receives its own copy of the response.
+
+    Only non-streaming requests go through the batcher.
+
+    >>> model = genai.GenerativeModel('models/gemini-pro', batcher=genai.AsyncBatcher())
+    >>> responses = await asyncio.gather(*[model.generate_content_async('Hi') for _ in range(10)])
+
+    Arguments:
+        max_batch: The maximum number of requests dispatched together.
+        max_wait_ms: How long to wait for more requests after the first one arrives.
+    """
+
+    def __init__(self, max_batch: int = 32, max_wait_ms: float = 5.0):
+        if max_batch < 1:
+            raise ValueError(f"`max_batch` must be positive, got: {max_batch}")
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        # Keep references to the running dispatches so they aren't garbage collected.
+        self._dispatches: set[asyncio.Task] = set()
+
+    async def submit(self, key: Any, call: _Call) -> glm.GenerateContentResponse:
+        """Queues `call` and waits for its result.
+
+        Arguments:
+            key: Calls in the same batch with an equal, non-`None` key are only sent once.
+            call: A zero-argument coroutine function that sends the request.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((key, call, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        # Exit when idle, `submit` restarts the worker when needed.
+        while not queue.empty():
+            batch = [queue.get_nowait()]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Don't wait for the responses, start collecting the next batch immediately.
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch):
+        groups: dict[Any, tuple[_Call, list[asyncio.Future]]] = {}
+        for n, (key, call, future) in enumerate(batch):
+            if key is None:
+                key = (None, n)
+            groups.setdefault(key, (call, []))[1].append(future)
+
+        results = await asyncio.gather(
+            *[call() for call, _ in groups.values()], return_exceptions=True
+        )
+
+        for (_, futures), result in zip(groups.values(), results):
+            for n, future in enumerate(futures):
+                if future.done():
+                    # The caller was cancelled.
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                elif n == 0:
+                    future.set_result(result)
+                else:
+                    future.set_result(copy.deepcopy(result))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import dataclasses
+import itertools
 import pathlib
 import re
 import types
@@ -86,10 +87,45 @@ class FileServiceAsyncClient(glm.FileServiceAsyncClient):
         raise NotImplementedError("`create_file` is not yet implemented for the async client.")
 
 
+class _AsyncClientPool:
+    """Spreads calls round-robin over several async clients, each with its own channel.
+
+    Concurrent requests on a single channel share one HTTP/2 connection, and can queue behind
+    its concurrent stream limit.
+    """
+
+    def __init__(self, clients: Sequence[Any]):
+        self._clients = list(clients)
+        self._next_client = itertools.cycle(self._clients)
+
+    def __getattr__(self, name):
+        return getattr(next(self._next_client), name)
+
+
+def _own_connection_transport(cls):
+    """Returns a transport factory for `cls` whose channel doesn't share its connection.
+
+    gRPC reuses one connection for every channel with the same target and arguments, unless
+    the channel has its own subchannel pool.
+    """
+
+    def make_transport(**kwargs):
+        transport_cls = cls.get_transport_class("grpc_asyncio")
+
+        def create_channel(*args, options=(), **kwargs):
+            options = [*options, ("grpc.use_local_subchannel_pool", 1)]
+            return transport_cls.create_channel(*args, options=options, **kwargs)
+
+        return transport_cls(channel=create_channel, **kwargs)
+
+    return make_transport
+
+
 @dataclasses.dataclass
 class _ClientManager:
     client_config: dict[str, Any] = dataclasses.field(default_factory=dict)
     default_metadata: Sequence[tuple[str, str]] = ()
+    async_pool_size: int = 1
 
     discuss_client: glm.DiscussServiceClient | None = None
     discuss_async_client: glm.DiscussServiceAsyncClient | None = None
@@ -110,6 +146,7 @@ class _ClientManager:
         client_options: client_options_lib.ClientOptions | dict[str, Any] | None = None,
         client_info: gapic_v1.client_info.ClientInfo | None = None,
         default_metadata: Sequence[tuple[str, str]] = (),
+        async_pool_size: int = 1,
     ) -> None:
         """Captures default client configuration.
 
@@ -127,7 +164,12 @@ class _ClientManager:
                 used.
             default_metadata: Default (key, value) metadata pairs to send with every request.
                 when using `transport="rest"` these are sent as HTTP headers.
+            async_pool_size: The number of channels each default async client spreads its
+                calls over. Raise this for many concurrent `*_async` calls.
         """
+        if async_pool_size < 1:
+            raise ValueError(f"`async_pool_size` must be positive, got: {async_pool_size}")
+
         if isinstance(client_options, dict):
             client_options = client_options_lib.from_dict(client_options)
         if client_options is None:
@@ -167,10 +209,12 @@ class _ClientManager:
 
         self.client_config = client_config
         self.default_metadata = default_metadata
+        self.async_pool_size = async_pool_size
 
         self.clients = {}
 
-    def make_client(self, name):
+    def make_client(self, name, *, own_connection: bool = False):
+        """Creates a client, `own_connection=True` gives a gRPC async client its own connection."""
         if name == "file":
             cls = FileServiceClient
         elif name == "file_async":
@@ -185,7 +229,10 @@ class _ClientManager:
         if not self.client_config:
             configure()
 
-        client = cls(**self.client_config)
+        client_config = self.client_config
+        if own_connection and client_config.get("transport", "grpc_asyncio") == "grpc_asyncio":
+            client_config = {**client_config, "transport": _own_connection_transport(cls)}
+        client = cls(**client_config)
 
         if not self.default_metadata:
             return client
@@ -227,7 +274,15 @@ class _ClientManager:
 
         client = self.clients.get(name)
         if client is None:
-            client = self.make_client(name)
+            if name.endswith("_async") and self.async_pool_size > 1:
+                client = _AsyncClientPool(
+                    [
+                        self.make_client(name, own_connection=True)
+                        for _ in range(self.async_pool_size)
+                    ]
+                )
+            else:
+                client = self.make_client(name)
             self.clients[name] = client
         return client
 
@@ -254,6 +309,7 @@ def configure(
     client_options: client_options_lib.ClientOptions | dict | None = None,
     client_info: gapic_v1.client_info.ClientInfo | None = None,
     default_metadata: Sequence[tuple[str, str]] = (),
+    async_pool_size: int = 1,
 ):
     """Captures default client configuration.
 
@@ -271,6 +327,8 @@ def configure(
             used.
         default_metadata: Default (key, value) metadata pairs to send with every request.
             when using `transport="rest"` these are sent as HTTP headers.
+        async_pool_size: The number of channels each default async client spreads its
+            calls over. Raise this for many concurrent `*_async` calls.
     """
     return _client_manager.configure(
         api_key=api_key,
@@ -279,6 +337,7 @@ def configure(
         client_options=client_options,
         client_info=client_info,
         default_metadata=default_metadata,
+        async_pool_size=async_pool_size,
     )
 
 
@@ -286,6 +345,14 @@ _client_manager = _ClientManager()
 _client_manager.configure()
 
 
+def get_default_cache_client() -> glm.CacheServiceClient:
+    return _client_manager.get_default_client("cache")
+
+
+def get_default_cache_async_client() -> glm.CacheServiceAsyncClient:
+    return _client_manager.get_default_client("cache_async")
+
+
 def get_default_discuss_client() -> glm.DiscussServiceClient:
     return _client_manager.get_default_client("discuss")
 
@@ -2,24 +2,67 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+import asyncio
+from collections.abc import AsyncIterable, Iterable
+import concurrent.futures
 import dataclasses
+import datetime
+import itertools
 import textwrap
-from typing import Any
+from typing import Any, Literal, overload
 from typing import Union
 import reprlib
+import sys
 
 # pylint: disable=bad-continuation, line-too-long
 
 
 import google.api_core.exceptions
 from google.ai import generativelanguage as glm
+from google.generativeai import batching
 from google.generativeai import client
+from google.generativeai import response_cache
 from google.generativeai import string_utils
 from google.generativeai.types import content_types
 from google.generativeai.types import generation_types
 from google.generativeai.types import safety_types
 
+_PAYLOAD_LIMIT_PREFIX = "Request payload size exceeds the limit:"
+_PAYLOAD_LIMIT_HINT = (
+    " Please upload your files with the File API instead."
+    "`f = genai.upload_file(path); m.generate_content(['tell me about this file:', f])`"
+)
+
+
+# Any other finish reason means the candidate was stopped early.
+_OK_FINISH = frozenset(
+    [
+        glm.Candidate.FinishReason.FINISH_REASON_UNSPECIFIED,
+        glm.Candidate.FinishReason.STOP,
+        glm.Candidate.FinishReason.MAX_TOKENS,
+    ]
+)
+
+
+def _add_payload_size_hint(e: google.api_core.exceptions.InvalidArgument):
+    if e.message.startswith(_PAYLOAD_LIMIT_PREFIX):
+        e.message += _PAYLOAD_LIMIT_HINT
+
+
+def _is_empty_override(value: Any) -> bool:
+    """True for `None` or an empty `dict` or `list`, e.g. `ChatSession` always passes a dict."""
+    return value is None or (isinstance(value, (dict, list, tuple)) and not value)
+
+
+def _is_complete_response(response: glm.GenerateContentResponse) -> bool:
+    """Returns False for blocked or stopped responses, a retry may succeed so don't cache them."""
+    if response.prompt_feedback.block_reason:
+        return False
+    candidates = response.candidates
+    return bool(candidates) and all(
+        candidate.finish_reason in _OK_FINISH for candidate in candidates
+    )
+
 
 class GenerativeModel:
     """
@@ -65,6 +108,10 @@ class GenerativeModel:
              by the api before being returned.
          generation_config: A `genai.GenerationConfig` setting the default generation parameters to
              use.
+         cache: Optional. A `genai.ResponseCache` used to skip the API call for repeated
+             non-streaming requests. Defaults to the cache set with `genai.set_llm_cache`.
+         batcher: Optional. A `genai.AsyncBatcher` that coalesces concurrent non-streaming
+             `generate_content_async` calls.
     """
 
     def __init__(
@@ -75,16 +122,25 @@ class GenerativeModel:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         system_instructions: content_types.ContentType | None = None,
+        cache: response_cache.ResponseCache | None = None,
+        batcher: batching.AsyncBatcher | None = None,
     ):
         if "/" not in model_name:
             model_name = "models/" + model_name
-        self._model_name = model_name
+        # Shared by every model (and request) using this name.
+        self._model_name = sys.intern(model_name)
         self._safety_settings = safety_types.to_easy_safety_dict(
             safety_settings, harm_category_set="new"
         )
         self._generation_config = generation_types.to_generation_config_dict(generation_config)
         self._tools = content_types.to_function_library(tools)
 
+        # These defaults are used as-is by every request that doesn't override them.
+        self._safety_settings_normalized = safety_types.normalize_safety_settings(
+            self._safety_settings, harm_category_set="new"
+        )
+        self._tools_proto = self._tools.to_proto() if self._tools is not None else None
+
         if tool_config is None:
             self._tool_config = None
         else:
@@ -95,6 +151,11 @@ class GenerativeModel:
         else:
             self._system_instructions = content_types.to_content(system_instructions)
 
+        self._cache = cache
+        self._batcher = batcher
+        # Built on first use, see `_prepare_request`.
+        self._request_template: glm.GenerateContentRequest | None = None
+
         self._client = None
         self._async_client = None
 
@@ -123,14 +184,37 @@ class GenerativeModel:
         safety_settings: safety_types.SafetySettingOptions | None = None,
         tools: content_types.FunctionLibraryType | None,
         tool_config: content_types.ToolConfigType | None,
+        cached_content: str | None = None,
     ) -> glm.GenerateContentRequest:
         """Creates a `glm.GenerateContentRequest` from raw inputs."""
         if not contents:
             raise TypeError("contents must not be empty")
 
-        tools_lib = self._get_tools_lib(tools)
-        if tools_lib is not None:
-            tools_lib = tools_lib.to_proto()
+        if (
+            _is_empty_override(generation_config)
+            and _is_empty_override(safety_settings)
+            and (tools is None or tools is self._tools)
+            and tool_config is None
+            and cached_content is None
+        ):
+            # Fast path: Everything but the contents comes from the model's defaults.
+            request = glm.GenerateContentRequest()
+            glm.GenerateContentRequest.copy_from(request, self._get_request_template())
+            request.contents.extend(content_types.to_contents(contents))
+            return request
+
+        if cached_content is not None and (
+            (tools is not None and tools is not self._tools) or tool_config is not None
+        ):
+            raise ValueError(
+                "`tools` and `tool_config` can't be overridden when using `cached_content`, "
+                "they are stored in the cached content."
+            )
+
+        if tools is None or tools is self._tools:
+            tools_lib = self._tools_proto
+        else:
+            tools_lib = content_types.to_function_library(tools).to_proto()
 
         if tool_config is None:
             tool_config = self._tool_config
@@ -140,13 +224,28 @@ class GenerativeModel:
         contents = content_types.to_contents(contents)
 
         generation_config = generation_types.to_generation_config_dict(generation_config)
-        merged_gc = self._generation_config.copy()
-        merged_gc.update(generation_config)
+        if generation_config:
+            merged_gc = {**self._generation_config, **generation_config}
+        else:
+            merged_gc = self._generation_config
 
         safety_settings = safety_types.to_easy_safety_dict(safety_settings, harm_category_set="new")
-        merged_ss = self._safety_settings.copy()
-        merged_ss.update(safety_settings)
-        merged_ss = safety_types.normalize_safety_settings(merged_ss, harm_category_set="new")
+        if safety_settings:
+            merged_ss = safety_types.normalize_safety_settings(
+                {**self._safety_settings, **safety_settings}, harm_category_set="new"
+            )
+        else:
+            merged_ss = self._safety_settings_normalized
+
+        if cached_content is not None:
+            # The tools and system instructions are stored in the `CachedContent`.
+            return glm.GenerateContentRequest(
+                model=self._model_name,
+                contents=contents,
+                generation_config=merged_gc,
+                safety_settings=merged_ss,
+                cached_content=cached_content,
+            )
 
         return glm.GenerateContentRequest(
             model=self._model_name,
@@ -158,6 +257,41 @@ class GenerativeModel:
             system_instructions=self._system_instructions,
         )
 
+    def _get_request_template(self) -> glm.GenerateContentRequest:
+        """Returns a request with this model's defaults and no `contents`. Don't modify it."""
+        if self._request_template is None:
+            self._request_template = glm.GenerateContentRequest(
+                model=self._model_name,
+                generation_config=self._generation_config,
+                safety_settings=self._safety_settings_normalized,
+                tools=self._tools_proto,
+                tool_config=self._tool_config,
+                system_instructions=self._system_instructions,
+            )
+        return self._request_template
+
+    def _make_cached_content(
+        self, contents: content_types.ContentsType, *, ttl: datetime.timedelta
+    ) -> glm.CachedContent:
+        """Creates a `glm.CachedContent` holding `contents` and this model's tools and instructions."""
+        return glm.CachedContent(
+            model=self._model_name,
+            contents=content_types.to_contents(contents),
+            tools=self._tools_proto,
+            tool_config=self._tool_config,
+            system_instruction=self._system_instructions,
+            ttl=ttl,
+        )
+
+    def _get_response_cache(
+        self, request: glm.GenerateContentRequest, *, stream: bool
+    ) -> response_cache.ResponseCache | None:
+        if stream or not response_cache.is_cacheable(request):
+            return None
+        if self._cache is not None:
+            return self._cache
+        return response_cache.get_llm_cache()
+
     def _get_tools_lib(
         self, tools: content_types.FunctionLibraryType
     ) -> content_types.FunctionLibrary | None:
@@ -166,6 +300,7 @@ class GenerativeModel:
         else:
             return content_types.to_function_library(tools)
 
+    @overload
     def generate_content(
         self,
         contents: content_types.ContentsType,
@@ -176,7 +311,40 @@ class GenerativeModel:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: dict[str, Any] | None = None,
+        cached_content: str | None = None,
+        raw_stream: Literal[False] = False,
     ) -> generation_types.GenerateContentResponse:
+        pass
+
+    @overload
+    def generate_content(
+        self,
+        contents: content_types.ContentsType,
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        stream: bool = False,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: dict[str, Any] | None = None,
+        cached_content: str | None = None,
+        raw_stream: Literal[True],
+    ) -> Iterable[glm.GenerateContentResponse]:
+        pass
+
+    def generate_content(
+        self,
+        contents: content_types.ContentsType,
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        stream: bool = False,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: dict[str, Any] | None = None,
+        cached_content: str | None = None,
+        raw_stream: bool = False,
+    ) -> generation_types.GenerateContentResponse | Iterable[glm.GenerateContentResponse]:
         """A multipurpose function to generate responses from the model.
 
         This `GenerativeModel.generate_content` method can handle multimodal input, and multi-turn
@@ -230,6 +398,12 @@ class GenerativeModel:
             stream: If True, yield response chunks as they are generated.
             tools: `glm.Tools` more info coming soon.
             request_options: Options for the request.
+            cached_content: Optional. The name of a `glm.CachedContent` to use as a prefix for
+                `contents`. The cached content supplies the tools and system instructions.
+            raw_stream: If True, stream the response and return the underlying iterator of
+                `glm.GenerateContentResponse` chunks, without collecting them into a
+                `GenerateContentResponse`. Accumulating the result is left to the caller, see
+                `genai.types.stream_text`.
         """
         request = self._prepare_request(
             contents=contents,
@@ -237,6 +411,7 @@ class GenerativeModel:
             safety_settings=safety_settings,
             tools=tools,
             tool_config=tool_config,
+            cached_content=cached_content,
         )
         if self._client is None:
             self._client = client.get_default_generative_client()
@@ -244,28 +419,33 @@ class GenerativeModel:
         if request_options is None:
             request_options = {}
 
+        cache = self._get_response_cache(request, stream=stream or raw_stream)
+        if cache is not None:
+            cache_key = response_cache.request_key(request)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return generation_types.GenerateContentResponse.from_response(cached)
+
         try:
-            if stream:
+            if stream or raw_stream:
                 with generation_types.rewrite_stream_error():
                     iterator = self._client.stream_generate_content(
                         request,
                         **request_options,
                     )
+                if raw_stream:
+                    return iterator
                 return generation_types.GenerateContentResponse.from_iterator(iterator)
             else:
-                response = self._client.generate_content(
-                    request,
-                    **request_options,
-                )
+                response = self._generate_content(request, request_options)
+                if cache is not None and _is_complete_response(response):
+                    cache.put(cache_key, response)
                 return generation_types.GenerateContentResponse.from_response(response)
         except google.api_core.exceptions.InvalidArgument as e:
-            if e.message.startswith("Request payload size exceeds the limit:"):
-                e.message += (
-                    " Please upload your files with the File API instead."
-                    "`f = genai.upload_file(path); m.generate_content(['tell me about this file:', f])`"
-                )
+            _add_payload_size_hint(e)
             raise
 
+    @overload
     async def generate_content_async(
         self,
         contents: content_types.ContentsType,
@@ -276,7 +456,40 @@ class GenerativeModel:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: dict[str, Any] | None = None,
+        cached_content: str | None = None,
+        raw_stream: Literal[False] = False,
     ) -> generation_types.AsyncGenerateContentResponse:
+        pass
+
+    @overload
+    async def generate_content_async(
+        self,
+        contents: content_types.ContentsType,
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        stream: bool = False,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: dict[str, Any] | None = None,
+        cached_content: str | None = None,
+        raw_stream: Literal[True],
+    ) -> AsyncIterable[glm.GenerateContentResponse]:
+        pass
+
+    async def generate_content_async(
+        self,
+        contents: content_types.ContentsType,
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        stream: bool = False,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: dict[str, Any] | None = None,
+        cached_content: str | None = None,
+        raw_stream: bool = False,
+    ) -> generation_types.AsyncGenerateContentResponse | AsyncIterable[glm.GenerateContentResponse]:
         """The async version of `GenerativeModel.generate_content`."""
         request = self._prepare_request(
             contents=contents,
@@ -284,6 +497,7 @@ class GenerativeModel:
             safety_settings=safety_settings,
             tools=tools,
             tool_config=tool_config,
+            cached_content=cached_content,
         )
         if self._async_client is None:
             self._async_client = client.get_default_generative_async_client()
@@ -291,28 +505,124 @@ class GenerativeModel:
         if request_options is None:
             request_options = {}
 
+        cache = self._get_response_cache(request, stream=stream or raw_stream)
+        if cache is not None:
+            cache_key = response_cache.request_key(request)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return generation_types.AsyncGenerateContentResponse.from_response(cached)
+
         try:
-            if stream:
+            if stream or raw_stream:
                 with generation_types.rewrite_stream_error():
                     iterator = await self._async_client.stream_generate_content(
                         request,
                         **request_options,
                     )
+                if raw_stream:
+                    return iterator
                 return await generation_types.AsyncGenerateContentResponse.from_aiterator(iterator)
             else:
-                response = await self._async_client.generate_content(
-                    request,
-                    **request_options,
-                )
+                response = await self._generate_content_async(request, request_options)
+                if cache is not None and _is_complete_response(response):
+                    cache.put(cache_key, response)
                 return generation_types.AsyncGenerateContentResponse.from_response(response)
         except google.api_core.exceptions.InvalidArgument as e:
-            if e.message.startswith("Request payload size exceeds the limit:"):
-                e.message += (
-                    " Please upload your files with the File API instead."
-                    "`f = genai.upload_file(path); m.generate_content(['tell me about this file:', f])`"
-                )
+            _add_payload_size_hint(e)
             raise
 
+    def _generate_content(
+        self, request: glm.GenerateContentRequest, request_options: dict[str, Any]
+    ) -> glm.GenerateContentResponse:
+        return self._client.generate_content(request, **request_options)
+
+    async def _generate_content_async(
+        self, request: glm.GenerateContentRequest, request_options: dict[str, Any]
+    ) -> glm.GenerateContentResponse:
+        if self._batcher is None:
+            return await self._async_client.generate_content(request, **request_options)
+
+        # Only coalesce requests that are fully described by the proto.
+        key = None if request_options else response_cache.request_key(request)
+        return await self._batcher.submit(
+            key, lambda: self._async_client.generate_content(request, **request_options)
+        )
+
+    def generate_content_batch(
+        self,
+        contents_list: Iterable[content_types.ContentsType],
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: dict[str, Any] | None = None,
+        max_concurrency: int = 8,
+    ) -> list[generation_types.GenerateContentResponse]:
+        """Generates a response for each prompt in `contents_list`.
+
+        The requests are sent concurrently, with at most `max_concurrency` in flight at once.
+        The responses are returned in the same order as `contents_list`.
+
+        >>> model = genai.GenerativeModel('models/gemini-pro')
+        >>> responses = model.generate_content_batch(['Tell me a joke', 'Tell me a story'])
+        >>> [r.text for r in responses]
+
+        Arguments:
+            contents_list: The prompts, each is anything accepted by `generate_content`.
+            max_concurrency: The maximum number of requests in flight at once.
+
+        The other arguments are applied to every request, see `GenerativeModel.generate_content`.
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"`max_concurrency` must be positive, got: {max_concurrency}")
+
+        if self._client is None:
+            self._client = client.get_default_generative_client()
+
+        def generate(contents):
+            return self.generate_content(
+                contents,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                tools=tools,
+                tool_config=tool_config,
+                request_options=request_options,
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(generate, contents_list))
+
+    async def generate_content_batch_async(
+        self,
+        contents_list: Iterable[content_types.ContentsType],
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: dict[str, Any] | None = None,
+        max_concurrency: int = 8,
+    ) -> list[generation_types.AsyncGenerateContentResponse]:
+        """The async version of `GenerativeModel.generate_content_batch`."""
+        if max_concurrency < 1:
+            raise ValueError(f"`max_concurrency` must be positive, got: {max_concurrency}")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def generate(contents):
+            async with semaphore:
+                return await self.generate_content_async(
+                    contents,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                    tools=tools,
+                    tool_config=tool_config,
+                    request_options=request_options,
+                )
+
+        return list(await asyncio.gather(*[generate(contents) for contents in contents_list]))
+
     # fmt: off
     def count_tokens(
         self,
@@ -353,6 +663,9 @@ class GenerativeModel:
         *,
         history: Iterable[content_types.StrictContentType] | None = None,
         enable_automatic_function_calling: bool = False,
+        semantic_cache: response_cache.SemanticCache | None = None,
+        cache_scope: str | bytes | None = None,
+        auto_cache_prefix: bool = False,
     ) -> ChatSession:
         """Returns a `genai.ChatSession` attached to this model.
 
@@ -362,6 +675,18 @@ class GenerativeModel:
 
         Arguments:
             history: An iterable of `glm.Content` objects, or equvalents to initialize the session.
+            enable_automatic_function_calling: If True, function calls requested by the model are
+                run and their results sent back automatically. With `send_message_async` the
+                functions run in worker threads, possibly concurrently, so they must be
+                thread-safe.
+            semantic_cache: Optional. A `genai.SemanticCache` used to answer messages similar to
+                ones already sent without calling the model.
+            cache_scope: Optional. Only `semantic_cache` entries added with the same scope, and
+                after the same chat history, can be returned. Defaults to a hash of the model's
+                name, tools, system instructions and other settings, so sessions configured the
+                same way share entries.
+            auto_cache_prefix: If True, once the conversation is long enough it is stored as a
+                `glm.CachedContent`, and later turns only send the new messages.
         """
         if self._generation_config.get("candidate_count", 1) > 1:
             raise ValueError("Can't chat with `candidate_count > 1`")
@@ -369,6 +694,9 @@ class GenerativeModel:
             model=self,
             history=history,
             enable_automatic_function_calling=enable_automatic_function_calling,
+            semantic_cache=semantic_cache,
+            cache_scope=cache_scope,
+            auto_cache_prefix=auto_cache_prefix,
         )
 
 
@@ -387,22 +715,46 @@ class ChatSession:
     Arguments:
         model: The model to use in the chat.
         history: A chat history to initialize the object with.
+        semantic_cache: Optional. A `genai.SemanticCache` used to answer messages similar to
+            ones already sent without calling the model.
+        cache_scope: Optional. Only `semantic_cache` entries added with the same scope, and after
+            the same chat history, can be returned. Defaults to a hash of the model's settings.
+        auto_cache_prefix: If True, once the conversation is long enough it is stored as a
+            `glm.CachedContent`, and later turns only send the new messages.
     """
 
     _USER_ROLE = "user"
     _MODEL_ROLE = "model"
 
+    _DICT_REPR = reprlib.Repr()
+
+    # The API's minimum size for a `CachedContent`.
+    _PREFIX_CACHE_MIN_TOKENS = 32768
+    _PREFIX_CACHE_TTL = datetime.timedelta(minutes=10)
+
     def __init__(
         self,
         model: GenerativeModel,
         history: Iterable[content_types.StrictContentType] | None = None,
         enable_automatic_function_calling: bool = False,
+        semantic_cache: response_cache.SemanticCache | None = None,
+        cache_scope: str | bytes | None = None,
+        auto_cache_prefix: bool = False,
     ):
         self.model: GenerativeModel = model
         self._history: list[glm.Content] = content_types.to_contents(history)
         self._last_sent: glm.Content | None = None
         self._last_received: generation_types.BaseGenerateContentResponse | None = None
         self.enable_automatic_function_calling = enable_automatic_function_calling
+        self._semantic_cache = semantic_cache
+        if cache_scope is None and semantic_cache is not None:
+            # Keep sessions with different tools or instructions apart.
+            cache_scope = response_cache.request_key(model._get_request_template())
+        self._cache_scope = cache_scope
+        self._auto_cache_prefix = auto_cache_prefix
+        self._cached_content: glm.CachedContent | None = None
+        # The number of `_history` entries stored in `_cached_content`.
+        self._cached_content_len = 0
 
     def send_message(
         self,
@@ -458,94 +810,282 @@ class ChatSession:
         if not content.role:
             content.role = self._USER_ROLE
 
-        history = self.history[:]
-        history.append(content)
+        last = self._last_received
+        # Read-only: `history` is the live `_history` list.
+        history = self._commit_last()
 
         generation_config = generation_types.to_generation_config_dict(generation_config)
         if generation_config.get("candidate_count", 1) > 1:
             raise ValueError("Can't chat with `candidate_count > 1`")
 
+        cache_vector = None
+        # Entries are scoped to the session's settings, a turn that overrides them could be
+        # answered with a response produced under different ones. With automatic function
+        # calling a hit would skip the function calls, and their turns in the history.
+        use_semantic_cache = (
+            self._semantic_cache is not None
+            and not stream
+            and tools is None
+            and tool_config is None
+            and not generation_config
+            and not safety_settings
+            and not (self.enable_automatic_function_calling and tools_lib is not None)
+        )
+        if use_semantic_cache:
+            # Only `content` is embedded, the same message can need a different answer later
+            # in the conversation, or in another one.
+            cache_scope = (self._cache_scope, response_cache.contents_key(history))
+            try:
+                cache_vector, cached = self._semantic_cache.lookup(
+                    content,
+                    scope=cache_scope,
+                )
+            except google.api_core.exceptions.GoogleAPICallError:
+                # The cache is only an optimization, answer from the model instead.
+                cache_vector, cached = None, None
+            if cached is not None:
+                response = generation_types.GenerateContentResponse.from_response(cached)
+                self._last_sent = content
+                self._last_received = response
+                return response
+
+        # After the checks above, so turns that don't call the model don't pay for the cache.
+        cached_content = None
+        if self._auto_cache_prefix and tools is None and tool_config is None:
+            cached_content = self._update_cached_prefix(history, last)
+
         response = self.model.generate_content(
-            contents=history,
+            contents=self._request_contents(history, [content], cached_content),
             generation_config=generation_config,
             safety_settings=safety_settings,
             stream=stream,
             tools=tools_lib,
             tool_config=tool_config,
+            cached_content=cached_content,
         )
 
         self._check_response(response=response, stream=stream)
 
         if self.enable_automatic_function_calling and tools_lib is not None:
-            self.history, content, response = self._handle_afc(
+            afc_turns, content, response = self._handle_afc(
                 response=response,
                 history=history,
+                content=content,
                 generation_config=generation_config,
                 safety_settings=safety_settings,
                 stream=stream,
                 tools_lib=tools_lib,
+                cached_content=cached_content,
             )
+            self._history.extend(afc_turns)
+
+        if cache_vector is not None:
+            self._semantic_cache.add(cache_vector, response._result, scope=cache_scope)
 
         self._last_sent = content
         self._last_received = response
 
         return response
 
-    def _check_response(self, *, response, stream):
+    def _request_contents(
+        self,
+        history: list[glm.Content],
+        turns: list[glm.Content],
+        cached_content: str | None,
+    ) -> Iterable[glm.Content]:
+        """Chains the new `turns` onto `history` without copying it, skipping any cached prefix."""
+        if cached_content is not None:
+            history = history[self._cached_content_len :]
+        return itertools.chain(history, turns)
+
+    def _prefix_cache_action(
+        self, history: list[glm.Content], last: generation_types.BaseGenerateContentResponse | None
+    ) -> str | None:
+        """Decides whether the prefix cache should be created or have its TTL extended."""
+        cached = self._cached_content
+        if cached is None:
+            if last is None or not history:
+                return None
+            if last._result.usage_metadata.total_token_count < self._PREFIX_CACHE_MIN_TOKENS:
+                return None
+            return "create"
+
+        # Extend the TTL before the cache expires, rather than on every turn.
+        remaining = cached.expire_time - datetime.datetime.now(datetime.timezone.utc)
+        if remaining < self._PREFIX_CACHE_TTL / 2:
+            return "refresh"
+        return None
+
+    def _update_cached_prefix(
+        self, history: list[glm.Content], last: generation_types.BaseGenerateContentResponse | None
+    ) -> str | None:
+        """Creates or refreshes the `glm.CachedContent` for `history`, returns its name."""
+        action = self._prefix_cache_action(history, last)
+        try:
+            if action == "create":
+                cached = self.model._make_cached_content(history, ttl=self._PREFIX_CACHE_TTL)
+                cache_client = client.get_default_cache_client()
+                self._cached_content = cache_client.create_cached_content(cached_content=cached)
+                self._cached_content_len = len(history)
+            elif action == "refresh":
+                cache_client = client.get_default_cache_client()
+                self._cached_content = cache_client.update_cached_content(
+                    cached_content=glm.CachedContent(
+                        name=self._cached_content.name, ttl=self._PREFIX_CACHE_TTL
+                    ),
+                    update_mask={"paths": ["ttl"]},
+                )
+        except google.api_core.exceptions.GoogleAPICallError:
+            # E.g. the model doesn't support caching, or a quota was hit. The cache is only an
+            # optimization, so send the full history instead.
+            self._drop_cached_prefix()
+
+        if self._cached_content is None:
+            return None
+        return self._cached_content.name
+
+    async def _update_cached_prefix_async(
+        self, history: list[glm.Content], last: generation_types.BaseGenerateContentResponse | None
+    ) -> str | None:
+        """The async version of `ChatSession._update_cached_prefix`."""
+        action = self._prefix_cache_action(history, last)
+        try:
+            if action == "create":
+                cached = self.model._make_cached_content(history, ttl=self._PREFIX_CACHE_TTL)
+                cache_client = client.get_default_cache_async_client()
+                self._cached_content = await cache_client.create_cached_content(
+                    cached_content=cached
+                )
+                self._cached_content_len = len(history)
+            elif action == "refresh":
+                cache_client = client.get_default_cache_async_client()
+                self._cached_content = await cache_client.update_cached_content(
+                    cached_content=glm.CachedContent(
+                        name=self._cached_content.name, ttl=self._PREFIX_CACHE_TTL
+                    ),
+                    update_mask={"paths": ["ttl"]},
+                )
+        except google.api_core.exceptions.GoogleAPICallError:
+            # E.g. the model doesn't support caching, or a quota was hit. The cache is only an
+            # optimization, so send the full history instead.
+            self._drop_cached_prefix()
+
+        if self._cached_content is None:
+            return None
+        return self._cached_content.name
+
+    def _drop_cached_prefix(self):
+        """Forgets the prefix cache, the next turns send the full history."""
+        self._cached_content = None
+        self._cached_content_len = 0
+
+    def _invalidate_cached_prefix(self):
+        cached = self._cached_content
+        if cached is None:
+            return
+        self._drop_cached_prefix()
+        try:
+            client.get_default_cache_client().delete_cached_content(name=cached.name)
+        except google.api_core.exceptions.GoogleAPICallError:
+            # The cache expires on its own, this only saves storage.
+            pass
+
+    def _check_response(
+        self, *, response: generation_types.BaseGenerateContentResponse, stream: bool
+    ):
         if response.prompt_feedback.block_reason:
             raise generation_types.BlockedPromptException(response.prompt_feedback)
 
         if not stream:
-            if response.candidates[0].finish_reason not in (
-                glm.Candidate.FinishReason.FINISH_REASON_UNSPECIFIED,
-                glm.Candidate.FinishReason.STOP,
-                glm.Candidate.FinishReason.MAX_TOKENS,
-            ):
+            if response.candidates[0].finish_reason not in _OK_FINISH:
                 raise generation_types.StopCandidateException(response.candidates[0])
 
-    def _get_function_calls(self, response) -> list[glm.FunctionCall]:
+    def _get_function_calls(
+        self, response: generation_types.BaseGenerateContentResponse
+    ) -> list[glm.FunctionCall]:
         candidates = response.candidates
         if len(candidates) != 1:
             raise ValueError(
                 f"Automatic function calling only works with 1 candidate, got: {len(candidates)}"
             )
-        parts = candidates[0].content.parts
-        function_calls = [part.function_call for part in parts if part and "function_call" in part]
+        # Check the raw protobuf parts, `"function_call" in part` is much slower than `HasField`.
+        content = candidates[0].content
+        parts = type(content).pb(content).parts
+        function_calls = [
+            glm.FunctionCall.wrap(part.function_call)
+            for part in parts
+            if part.HasField("function_call")
+        ]
         return function_calls
 
+    def _call_functions(
+        self, tools_lib: content_types.FunctionLibrary, function_calls: list[glm.FunctionCall]
+    ) -> list[glm.Part]:
+        function_response_parts: list[glm.Part] = []
+        for fc in function_calls:
+            fr = tools_lib(fc)
+            assert fr is not None, (
+                "This should never happen, it should only return None if the declaration"
+                "is not callable, and that's guarded against above."
+            )
+            function_response_parts.append(fr)
+        return function_response_parts
+
+    async def _call_functions_async(
+        self, tools_lib: content_types.FunctionLibrary, function_calls: list[glm.FunctionCall]
+    ) -> list[glm.Part]:
+        """Runs the function calls concurrently, each in a worker thread.
+
+        The model requests several calls at once when they are independent, so I/O bound
+        functions shouldn't wait for each other. A single call also runs in a thread, so a
+        blocking function never stalls the event loop.
+        """
+        function_response_parts = await asyncio.gather(
+            *[asyncio.to_thread(tools_lib, fc) for fc in function_calls]
+        )
+        assert all(fr is not None for fr in function_response_parts), (
+            "This should never happen, it should only return None if the declaration"
+            "is not callable, and that's guarded against above."
+        )
+        return list(function_response_parts)
+
     def _handle_afc(
-        self, *, response, history, generation_config, safety_settings, stream, tools_lib
+        self,
+        *,
+        response: generation_types.BaseGenerateContentResponse,
+        history: list[glm.Content],
+        content: glm.Content,
+        generation_config: generation_types.GenerationConfigType,
+        safety_settings: safety_types.SafetySettingOptions,
+        stream: bool,
+        tools_lib: content_types.FunctionLibrary,
+        cached_content: str | None = None,
     ) -> tuple[list[glm.Content], glm.Content, generation_types.BaseGenerateContentResponse]:
-
+        # Only the new turns are collected here, `history` is not modified.
+        turns = [content]
         while function_calls := self._get_function_calls(response):
             if not all(callable(tools_lib[fc]) for fc in function_calls):
                 break
-            history.append(response.candidates[0].content)
-
-            function_response_parts: list[glm.Part] = []
-            for fc in function_calls:
-                fr = tools_lib(fc)
-                assert fr is not None, (
-                    "This should never happen, it should only return None if the declaration"
-                    "is not callable, and that's guarded against above."
-                )
-                function_response_parts.append(fr)
+            turns.append(response.candidates[0].content)
+
+            function_response_parts = self._call_functions(tools_lib, function_calls)
 
             send = glm.Content(role=self._USER_ROLE, parts=function_response_parts)
-            history.append(send)
+            turns.append(send)
 
             response = self.model.generate_content(
-                contents=history,
+                contents=self._request_contents(history, turns, cached_content),
                 generation_config=generation_config,
                 safety_settings=safety_settings,
                 stream=stream,
                 tools=tools_lib,
+                cached_content=cached_content,
             )
 
             self._check_response(response=response, stream=stream)
 
-        *history, content = history
-        return history, content, response
+        *turns, content = turns
+        return turns, content, response
 
     async def send_message_async(
         self,
@@ -557,7 +1097,12 @@ class ChatSession:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
     ) -> generation_types.AsyncGenerateContentResponse:
-        """The async version of `ChatSession.send_message`."""
+        """The async version of `ChatSession.send_message`.
+
+        With `enable_automatic_function_calling=True`, the functions the model calls are run in
+        worker threads (with `asyncio.to_thread`), concurrently when the model requests several
+        calls at once. So the functions must be thread-safe.
+        """
         if self.enable_automatic_function_calling and stream:
             raise NotImplementedError(
                 "The `google.generativeai` SDK does not yet support `stream=True` with "
@@ -571,33 +1116,77 @@ class ChatSession:
         if not content.role:
             content.role = self._USER_ROLE
 
-        history = self.history[:]
-        history.append(content)
+        last = self._last_received
+        # Read-only: `history` is the live `_history` list.
+        history = self._commit_last()
 
         generation_config = generation_types.to_generation_config_dict(generation_config)
         if generation_config.get("candidate_count", 1) > 1:
             raise ValueError("Can't chat with `candidate_count > 1`")
 
+        cache_vector = None
+        # Entries are scoped to the session's settings, a turn that overrides them could be
+        # answered with a response produced under different ones. With automatic function
+        # calling a hit would skip the function calls, and their turns in the history.
+        use_semantic_cache = (
+            self._semantic_cache is not None
+            and not stream
+            and tools is None
+            and tool_config is None
+            and not generation_config
+            and not safety_settings
+            and not (self.enable_automatic_function_calling and tools_lib is not None)
+        )
+        if use_semantic_cache:
+            # Only `content` is embedded, the same message can need a different answer later
+            # in the conversation, or in another one.
+            cache_scope = (self._cache_scope, response_cache.contents_key(history))
+            try:
+                cache_vector, cached = await self._semantic_cache.lookup_async(
+                    content,
+                    scope=cache_scope,
+                )
+            except google.api_core.exceptions.GoogleAPICallError:
+                # The cache is only an optimization, answer from the model instead.
+                cache_vector, cached = None, None
+            if cached is not None:
+                response = generation_types.AsyncGenerateContentResponse.from_response(cached)
+                self._last_sent = content
+                self._last_received = response
+                return response
+
+        # After the checks above, so turns that don't call the model don't pay for the cache.
+        cached_content = None
+        if self._auto_cache_prefix and tools is None and tool_config is None:
+            cached_content = await self._update_cached_prefix_async(history, last)
+
         response = await self.model.generate_content_async(
-            contents=history,
+            contents=self._request_contents(history, [content], cached_content),
             generation_config=generation_config,
             safety_settings=safety_settings,
             stream=stream,
             tools=tools_lib,
             tool_config=tool_config,
+            cached_content=cached_content,
         )
 
         self._check_response(response=response, stream=stream)
 
         if self.enable_automatic_function_calling and tools_lib is not None:
-            self.history, content, response = await self._handle_afc_async(
+            afc_turns, content, response = await self._handle_afc_async(
                 response=response,
                 history=history,
+                content=content,
                 generation_config=generation_config,
                 safety_settings=safety_settings,
                 stream=stream,
                 tools_lib=tools_lib,
+                cached_content=cached_content,
             )
+            self._history.extend(afc_turns)
+
+        if cache_vector is not None:
+            self._semantic_cache.add(cache_vector, response._result, scope=cache_scope)
 
         self._last_sent = content
         self._last_received = response
@@ -605,50 +1194,56 @@ class ChatSession:
         return response
 
     async def _handle_afc_async(
-        self, *, response, history, generation_config, safety_settings, stream, tools_lib
+        self,
+        *,
+        response: generation_types.BaseGenerateContentResponse,
+        history: list[glm.Content],
+        content: glm.Content,
+        generation_config: generation_types.GenerationConfigType,
+        safety_settings: safety_types.SafetySettingOptions,
+        stream: bool,
+        tools_lib: content_types.FunctionLibrary,
+        cached_content: str | None = None,
     ) -> tuple[list[glm.Content], glm.Content, generation_types.BaseGenerateContentResponse]:
-
+        # Only the new turns are collected here, `history` is not modified.
+        turns = [content]
         while function_calls := self._get_function_calls(response):
             if not all(callable(tools_lib[fc]) for fc in function_calls):
                 break
-            history.append(response.candidates[0].content)
-
-            function_response_parts: list[glm.Part] = []
-            for fc in function_calls:
-                fr = tools_lib(fc)
-                assert fr is not None, (
-                    "This should never happen, it should only return None if the declaration"
-                    "is not callable, and that's guarded against above."
-                )
-                function_response_parts.append(fr)
+            turns.append(response.candidates[0].content)
+
+            function_response_parts = await self._call_functions_async(tools_lib, function_calls)
 
             send = glm.Content(role=self._USER_ROLE, parts=function_response_parts)
-            history.append(send)
+            turns.append(send)
 
             response = await self.model.generate_content_async(
-                contents=history,
+                contents=self._request_contents(history, turns, cached_content),
                 generation_config=generation_config,
                 safety_settings=safety_settings,
                 stream=stream,
                 tools=tools_lib,
+                cached_content=cached_content,
             )
 
             self._check_response(response=response, stream=stream)
 
-        *history, content = history
-        return history, content, response
+        *turns, content = turns
+        return turns, content, response
 
     def __copy__(self):
         return ChatSession(
             model=self.model,
             # Be sure the copy doesn't share the history.
-            history=list(self.history),
+            history=list(self._commit_last()),
         )
 
     def rewind(self) -> tuple[glm.Content, glm.Content]:
         """Removes the last request/response pair from the chat history."""
         if self._last_received is None:
             result = self._history.pop(-2), self._history.pop()
+            if len(self._history) < self._cached_content_len:
+                self._invalidate_cached_prefix()
             return result
         else:
             result = self._last_sent, self._last_received.candidates[0].content
@@ -664,15 +1259,26 @@ class ChatSession:
     @property
     def history(self) -> list[glm.Content]:
         """The chat history."""
+        return self._commit_last()
+
+    @history.setter
+    def history(self, history):
+        self._history = content_types.to_contents(history)
+        self._last_sent = None
+        self._last_received = None
+        self._invalidate_cached_prefix()
+
+    def _commit_last(self) -> list[glm.Content]:
+        """Moves the last sent and received messages into `_history`, and returns it.
+
+        Raises:
+            BrokenResponseError: If the last response was stopped or failed while streaming.
+        """
         last = self._last_received
         if last is None:
             return self._history
 
-        if last.candidates[0].finish_reason not in (
-            glm.Candidate.FinishReason.FINISH_REASON_UNSPECIFIED,
-            glm.Candidate.FinishReason.STOP,
-            glm.Candidate.FinishReason.MAX_TOKENS,
-        ):
+        if last.candidates[0].finish_reason not in _OK_FINISH:
             error = generation_types.StopCandidateException(last.candidates[0])
             last._error = error
 
@@ -698,24 +1304,18 @@ class ChatSession:
 
         return self._history
 
-    @history.setter
-    def history(self, history):
-        self._history = content_types.to_contents(history)
-        self._last_sent = None
-        self._last_received = None
-
     def __repr__(self) -> str:
-        _dict_repr = reprlib.Repr()
+        try:
+            history = list(self._commit_last())
+        except (generation_types.BrokenResponseError, generation_types.IncompleteIterationError):
+            history = list(self._history)
+
+        _dict_repr = self._DICT_REPR
         _model = str(self.model).replace("\n", "\n" + " " * 4)
 
         def content_repr(x):
             return f"glm.Content({_dict_repr.repr(type(x).to_dict(x))})"
 
-        try:
-            history = list(self.history)
-        except (generation_types.BrokenResponseError, generation_types.IncompleteIterationError):
-            history = list(self._history)
-
         if self._last_sent is not None:
             history.append(self._last_sent)
         history = [content_repr(x) for x in history]
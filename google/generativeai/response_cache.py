@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Opt-in caches for `GenerativeModel` and `ChatSession` responses."""
+from __future__ import annotations
+
+import collections
+import hashlib
+import math
+import operator
+import threading
+import time
+from typing import Hashable, Iterable
+
+from google.ai import generativelanguage as glm
+from google.generativeai import embedding
+
+__all__ = ["ResponseCache", "SemanticCache", "set_llm_cache", "get_llm_cache"]
+
+DEFAULT_SEMANTIC_CACHE_MODEL = "models/text-embedding-004"
+
+
+def _update(h, data: bytes):
+    # Length-prefixed, so adjacent fields can't run together.
+    h.update(len(data).to_bytes(8, "little"))
+    h.update(data)
+
+
+def _serialize_field(field, value) -> bytes:
+    if field.type != field.TYPE_MESSAGE:
+        return repr(value).encode()
+    if field.label == field.LABEL_REPEATED:
+        return b"".join(_serialize_field_item(item) for item in value)
+    return _serialize_field_item(value)
+
+
+def _serialize_field_item(message) -> bytes:
+    serialized = message.SerializeToString(deterministic=True)
+    return len(serialized).to_bytes(8, "little") + serialized
+
+
+def _update_contents(h, contents):
+    for content in contents:
+        _update(h, content.role.encode())
+        h.update(len(content.parts).to_bytes(8, "little"))
+        for part in content.parts:
+            if part.HasField("inline_data"):
+                _update(h, b"inline_data")
+                _update(h, part.inline_data.mime_type.encode())
+                _update(h, part.inline_data.data)
+            else:
+                _update(h, b"part")
+                _update(h, part.SerializeToString(deterministic=True))
+
+
+def request_key(request: glm.GenerateContentRequest) -> bytes:
+    """Returns a stable hash of a `glm.GenerateContentRequest`, including the model name.
+
+    The request is hashed field by field rather than serialized as a whole, so inline blobs
+    (images, audio, ...) are fed to the hash directly instead of being copied into one large
+    serialized buffer first.
+    """
+    h = hashlib.blake2b()
+    for field, value in type(request).pb(request).ListFields():
+        _update(h, field.name.encode())
+        if field.name != "contents":
+            _update(h, _serialize_field(field, value))
+            continue
+
+        _update_contents(h, value)
+    return h.digest()
+
+
+def contents_key(contents: Iterable[glm.Content]) -> bytes:
+    """Returns a stable hash of a conversation, hashed the same way as `request_key`."""
+    h = hashlib.blake2b()
+    _update_contents(h, (type(content).pb(content) for content in contents))
+    return h.digest()
+
+
+def is_cacheable(request: glm.GenerateContentRequest) -> bool:
+    """Returns False for requests that explicitly ask for several distinct samples."""
+    generation_config = request.generation_config
+    return not (generation_config.temperature > 0 and generation_config.candidate_count > 1)
+
+
+class ResponseCache:
+    """A thread-safe LRU cache of `glm.GenerateContentResponse` objects.
+
+    Pass one to `genai.GenerativeModel(..., cache=...)`, or set a process-wide default with
+    `genai.set_llm_cache`. Only non-streaming requests are cached.
+
+    >>> cache = genai.ResponseCache(max_entries=256, ttl=600)
+    >>> model = genai.GenerativeModel('models/gemini-pro', cache=cache)
+    >>> model.generate_content('Hello')  # Calls the API.
+    >>> model.generate_content('Hello')  # Returns a copy of the cached response.
+
+    Arguments:
+        max_entries: The maximum number of responses to keep. The least recently used
+            entries are evicted first.
+        ttl: Optional. The number of seconds an entry stays valid.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float | None = None):
+        if max_entries < 1:
+            raise ValueError(f"`max_entries` must be positive, got: {max_entries}")
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expiry time, serialized `glm.GenerateContentResponse`)
+        self._entries: collections.OrderedDict[bytes, tuple[float | None, bytes]] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: bytes) -> glm.GenerateContentResponse | None:
+        """Returns a fresh copy of the cached response for `key`, or `None`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiry, data = entry
+            if expiry is not None and expiry < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        # Stored serialized, so callers can't mutate the cached copy.
+        return glm.GenerateContentResponse.deserialize(data)
+
+    def put(self, key: bytes, response: glm.GenerateContentResponse):
+        """Stores `response` under `key`, evicting the least recently used entry if full."""
+        data = type(response).serialize(response)
+        expiry = None if self._ttl is None else time.monotonic() + self._ttl
+        with self._lock:
+            self._entries[key] = (expiry, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _normalize(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return list(vector)
+    return [x / norm for x in vector]
+
+
+def _cache_text(content: glm.Content) -> str | None:
+    """Returns the text of a single-part text message, or `None` for anything else."""
+    parts = content.parts
+    if len(parts) != 1 or "text" not in parts[0]:
+        return None
+    return parts[0].text
+
+
+class SemanticCache:
+    """A cache that matches chat messages by embedding similarity rather than exact equality.
+
+    Pass one to `GenerativeModel.start_chat(semantic_cache=...)`. Before each non-streaming
+    `ChatSession.send_message`, the new message is embedded, and if a previously sent message
+    has a cosine similarity above `threshold` the stored response is returned without calling
+    the model. Only single-part text messages are cached.
+
+    Only the latest message is embedded, `ChatSession` keeps conversations with different
+    histories apart by including a hash of the history in the `scope`.
+
+    >>> cache = genai.SemanticCache(threshold=0.95)
+    >>> chat = model.start_chat(semantic_cache=cache)
+    >>> chat.send_message("What is the capital of France?")
+    >>> chat.send_message("What's the capital of France?")  # Likely served from the cache.
+
+    Arguments:
+        threshold: The minimum cosine similarity for a cache hit.
+        model: The embedding model used to embed the messages.
+        max_entries: The maximum number of responses to keep, the oldest are evicted first.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        model: str = DEFAULT_SEMANTIC_CACHE_MODEL,
+        max_entries: int = 1024,
+    ):
+        if max_entries < 1:
+            raise ValueError(f"`max_entries` must be positive, got: {max_entries}")
+        self._threshold = threshold
+        self._model = model
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        # Parallel lists: L2-normalized embeddings, scopes, and serialized responses.
+        self._vectors: collections.deque[list[float]] = collections.deque()
+        self._scopes: collections.deque[Hashable] = collections.deque()
+        self._responses: collections.deque[bytes] = collections.deque()
+
+    def _search(self, vector: list[float], scope: Hashable) -> glm.GenerateContentResponse | None:
+        best_score = -math.inf
+        best = None
+        with self._lock:
+            for other, other_scope, data in zip(self._vectors, self._scopes, self._responses):
+                if other_scope != scope:
+                    continue
+                score = sum(map(operator.mul, vector, other))
+                if score > best_score:
+                    best_score, best = score, data
+
+        if best is None or best_score < self._threshold:
+            return None
+        return glm.GenerateContentResponse.deserialize(best)
+
+    def lookup(
+        self, content: glm.Content, *, scope: Hashable = None
+    ) -> tuple[list[float] | None, glm.GenerateContentResponse | None]:
+        """Embeds `content` and searches the entries added with the same `scope`.
+
+        Returns:
+            A `(vector, response)` pair. `vector` is `None` if the content can't be cached,
+            pass it back to `SemanticCache.add` on a miss. `response` is `None` on a miss.
+        """
+        text = _cache_text(content)
+        if text is None:
+            return None, None
+        result = embedding.embed_content(model=self._model, content=text)
+        vector = _normalize(result["embedding"])
+        return vector, self._search(vector, scope)
+
+    async def lookup_async(
+        self, content: glm.Content, *, scope: Hashable = None
+    ) -> tuple[list[float] | None, glm.GenerateContentResponse | None]:
+        """The async version of `SemanticCache.lookup`."""
+        text = _cache_text(content)
+        if text is None:
+            return None, None
+        result = await embedding.embed_content_async(model=self._model, content=text)
+        vector = _normalize(result["embedding"])
+        return vector, self._search(vector, scope)
+
+    def add(
+        self, vector: list[float], response: glm.GenerateContentResponse, *, scope: Hashable = None
+    ):
+        """Stores `response` under the `vector` returned by `SemanticCache.lookup`."""
+        data = type(response).serialize(response)
+        with self._lock:
+            self._vectors.append(vector)
+            self._scopes.append(scope)
+            self._responses.append(data)
+            while len(self._vectors) > self._max_entries:
+                self._vectors.popleft()
+                self._scopes.popleft()
+                self._responses.popleft()
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+            self._scopes.clear()
+            self._responses.clear()
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+
+_llm_cache: ResponseCache | None = None
+
+
+def set_llm_cache(cache: ResponseCache | None):
+    """Sets the default `ResponseCache` used by every `GenerativeModel` without its own `cache`.
+
+    Pass `None` to disable the default cache.
+    """
+    global _llm_cache
+    _llm_cache = cache
+
+
+def get_llm_cache() -> ResponseCache | None:
+    """Returns the default `ResponseCache` set by `genai.set_llm_cache`."""
+    return _llm_cache
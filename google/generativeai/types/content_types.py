@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Mapping, Sequence
+import collections
+from collections.abc import Hashable, Iterable, Mapping, Sequence
+import copy
 import io
 import inspect
+import itertools
 import mimetypes
 import typing
+import sys
+import weakref
 from typing import Any, Callable, Union
 from typing_extensions import TypedDict
 
@@ -17,23 +22,6 @@ if typing.TYPE_CHECKING:
     import PIL.Image
     import IPython.display
 
-    IMAGE_TYPES = (PIL.Image.Image, IPython.display.Image)
-else:
-    IMAGE_TYPES = ()
-    try:
-        import PIL.Image
-
-        IMAGE_TYPES = IMAGE_TYPES + (PIL.Image.Image,)
-    except ImportError:
-        PIL = None
-
-    try:
-        import IPython.display
-
-        IMAGE_TYPES = IMAGE_TYPES + (IPython.display.Image,)
-    except ImportError:
-        IPython = None
-
 
 __all__ = [
     "BlobDict",
@@ -55,26 +43,84 @@ __all__ = [
 ]
 
 
-def pil_to_blob(img):
+_IMAGE_MODULES = ("PIL.Image", "IPython.display")
+_image_types_cache: tuple[type, ...] = ()
+
+
+def _image_types() -> tuple[type, ...]:
+    """Returns the supported image types.
+
+    `PIL` and `IPython` are slow to import, so they aren't imported here. An image can't exist
+    unless its module has already been imported, so it's enough to check `sys.modules`. Once
+    both modules have been found the result can't change, so it's cached.
+    """
+    global _image_types_cache
+    if len(_image_types_cache) == len(_IMAGE_MODULES):
+        return _image_types_cache
+
+    image_types = ()
+    if (pil_image := sys.modules.get("PIL.Image")) is not None:
+        image_types += (pil_image.Image,)
+    if (ipython_display := sys.modules.get("IPython.display")) is not None:
+        image_types += (ipython_display.Image,)
+    _image_types_cache = image_types
+    return image_types
+
+
+def _find_converter(
+    converters: dict[type, Callable[[Any], Any]], obj: Any
+) -> Callable[[Any], Any] | None:
+    """Looks up the converter for `type(obj)`, falling back to `isinstance` checks.
+
+    The `isinstance` result is stored under `type(obj)`, so each type only takes the slow
+    path once. Returns `None` if nothing matches.
+    """
+    converter = converters.get(type(obj))
+    if converter is None:
+        for cls, candidate in list(converters.items()):
+            if isinstance(obj, cls):
+                converter = candidate
+                converters[type(obj)] = converter
+                break
+    return converter
+
+
+def _is_list_like(obj: Any) -> bool:
+    """`isinstance(obj, Iterable) and not isinstance(obj, (str, bytes, Mapping))`, but faster.
+
+    ABC `isinstance` checks are slow, so the common types are checked by `type` first.
+    """
+    t = type(obj)
+    if t is list or t is tuple:
+        return True
+    if t is str or t is bytes or t is dict:
+        return False
+    return hasattr(obj, "__iter__") and not isinstance(obj, (str, bytes, Mapping))
+
+
+# JPEG can't store transparency or a palette.
+_PNG_ONLY_MODES = frozenset({"RGBA", "LA", "P", "PA"})
+
+
+def pil_to_blob(img) -> glm.Blob:
     bytesio = io.BytesIO()
-    if isinstance(img, PIL.PngImagePlugin.PngImageFile):
+    if img.format == "PNG" or img.mode in _PNG_ONLY_MODES:
         img.save(bytesio, format="PNG")
         mime_type = "image/png"
     else:
         img.save(bytesio, format="JPEG")
         mime_type = "image/jpeg"
-    bytesio.seek(0)
-    data = bytesio.read()
-    return glm.Blob(mime_type=mime_type, data=data)
+    # `getvalue` avoids the extra copy `read` makes.
+    return glm.Blob(mime_type=mime_type, data=bytesio.getvalue())
 
 
 def image_to_blob(image) -> glm.Blob:
-    if PIL is not None:
-        if isinstance(image, PIL.Image.Image):
+    if (pil_image := sys.modules.get("PIL.Image")) is not None:
+        if isinstance(image, pil_image.Image):
             return pil_to_blob(image)
 
-    if IPython is not None:
-        if isinstance(image, IPython.display.Image):
+    if (ipython_display := sys.modules.get("IPython.display")) is not None:
+        if isinstance(image, ipython_display.Image):
             name = image.filename
             if name is None:
                 raise ValueError(
@@ -101,20 +147,29 @@ class BlobDict(TypedDict):
     data: bytes
 
 
+def _content_dict_to_content(d: Mapping) -> glm.Content:
+    content = dict(d)
+    if isinstance(parts := content["parts"], str):
+        content["parts"] = [parts]
+    content["parts"] = [to_part(part) for part in content["parts"]]
+    return glm.Content(content)
+
+
+def _part_dict_to_part(d: Mapping) -> glm.Part:
+    # A part-dict has a single key.
+    ((key, value),) = d.items()
+    if key == "inline_data":
+        value = to_blob(value)
+    elif key == "file_data":
+        value = to_file_data(value)
+    return glm.Part({key: value})
+
+
 def _convert_dict(d: Mapping) -> glm.Content | glm.Part | glm.Blob:
     if is_content_dict(d):
-        content = dict(d)
-        if isinstance(parts := content["parts"], str):
-            content["parts"] = [parts]
-        content["parts"] = [to_part(part) for part in content["parts"]]
-        return glm.Content(content)
+        return _content_dict_to_content(d)
     elif is_part_dict(d):
-        part = dict(d)
-        if "inline_data" in part:
-            part["inline_data"] = to_blob(part["inline_data"])
-        if "file_data" in part:
-            part["file_data"] = to_file_data(part["file_data"])
-        return glm.Part(part)
+        return _part_dict_to_part(d)
     elif is_blob_dict(d):
         blob = d
         return glm.Blob(blob)
@@ -128,7 +183,7 @@ def _convert_dict(d: Mapping) -> glm.Content | glm.Part | glm.Blob:
         )
 
 
-def is_blob_dict(d):
+def is_blob_dict(d: Mapping) -> bool:
     return "mime_type" in d and "data" in d
 
 
@@ -141,12 +196,18 @@ else:
 
 
 def to_blob(blob: BlobType) -> glm.Blob:
+    if type(blob) is glm.Blob:
+        return blob
+
     if isinstance(blob, Mapping):
+        if is_blob_dict(blob) and not is_content_dict(blob):
+            return glm.Blob(blob)
+        # Let `_convert_dict` classify it, for the error below.
         blob = _convert_dict(blob)
 
     if isinstance(blob, glm.Blob):
         return blob
-    elif isinstance(blob, IMAGE_TYPES):
+    elif isinstance(blob, _image_types()):
         return image_to_blob(blob)
     else:
         if isinstance(blob, Mapping):
@@ -169,7 +230,10 @@ class FileDataDict(TypedDict):
 FileDataType = Union[FileDataDict, glm.FileData, file_types.File]
 
 
-def to_file_data(file_data: FileDataType):
+def to_file_data(file_data: FileDataType) -> glm.FileData:
+    if type(file_data) is glm.FileData:
+        return file_data
+
     if isinstance(file_data, dict):
         if "file_uri" in file_data:
             file_data = glm.FileData(file_data)
@@ -200,36 +264,50 @@ class PartDict(TypedDict):
 PartType = Union[glm.Part, PartDict, BlobType, str, glm.FunctionCall, glm.FunctionResponse]
 
 
-def is_part_dict(d):
-    keys = list(d.keys())
-    if len(keys) != 1:
-        return False
+_PART_KEYS = frozenset(["text", "inline_data", "function_call", "function_response", "file_data"])
 
-    key = keys[0]
 
-    return key in ["text", "inline_data", "function_call", "function_response", "file_data"]
+def is_part_dict(d: Mapping) -> bool:
+    return len(d) == 1 and next(iter(d)) in _PART_KEYS
 
 
-def to_part(part: PartType):
-    if isinstance(part, Mapping):
-        part = _convert_dict(part)
+def _dict_to_part(part: Mapping) -> glm.Part:
+    # Only check for the kinds of `dict` a part can come from, in order of likelihood.
+    if is_part_dict(part):
+        return _part_dict_to_part(part)
+    if is_blob_dict(part) and not is_content_dict(part):
+        return glm.Part(inline_data=glm.Blob(part))
 
+    part = _convert_dict(part)
     if isinstance(part, glm.Part):
         return part
-    elif isinstance(part, str):
-        return glm.Part(text=part)
-    elif isinstance(part, glm.FileData):
-        return glm.Part(file_data=part)
-    elif isinstance(part, (glm.File, file_types.File)):
-        return glm.Part(file_data=to_file_data(part))
-    elif isinstance(part, glm.FunctionCall):
-        return glm.Part(function_call=part)
-    elif isinstance(part, glm.FunctionCall):
-        return glm.Part(function_response=part)
+    # Maybe it's a blob-dict?
+    return glm.Part(inline_data=to_blob(part))
+
+
+_PART_CONVERTERS: dict[type, Callable[[Any], glm.Part]] = {
+    glm.Part: lambda part: part,
+    str: lambda part: glm.Part(text=part),
+    Mapping: _dict_to_part,
+    glm.Blob: lambda part: glm.Part(inline_data=part),
+    glm.FileData: lambda part: glm.Part(file_data=part),
+    glm.File: lambda part: glm.Part(file_data=to_file_data(part)),
+    file_types.File: lambda part: glm.Part(file_data=to_file_data(part)),
+    glm.FunctionCall: lambda part: glm.Part(function_call=part),
+    glm.FunctionResponse: lambda part: glm.Part(function_response=part),
+}
 
-    else:
-        # Maybe it can be turned into a blob?
-        return glm.Part(inline_data=to_blob(part))
+
+def to_part(part: PartType) -> glm.Part:
+    if type(part) is glm.Part:
+        return part
+
+    converter = _find_converter(_PART_CONVERTERS, part)
+    if converter is not None:
+        return converter(part)
+
+    # Maybe it can be turned into a blob?
+    return glm.Part(inline_data=to_blob(part))
 
 
 class ContentDict(TypedDict):
@@ -237,7 +315,7 @@ class ContentDict(TypedDict):
     role: str
 
 
-def is_content_dict(d):
+def is_content_dict(d: Mapping) -> bool:
     return "parts" in d
 
 
@@ -249,24 +327,41 @@ ContentType = Union[glm.Content, ContentDict, Iterable[PartType], PartType]
 StrictContentType = Union[glm.Content, ContentDict]
 
 
-def to_content(content: ContentType):
+def _dict_to_content(content: Mapping) -> glm.Content:
+    if is_content_dict(content):
+        return _content_dict_to_content(content)
+    # Maybe this is a Part?
+    return glm.Content(parts=[_dict_to_part(content)])
+
+
+_CONTENT_CONVERTERS: dict[type, Callable[[Any], glm.Content]] = {
+    glm.Content: lambda content: content,
+    str: lambda content: glm.Content(parts=[glm.Part(text=content)]),
+    Mapping: _dict_to_content,
+    # Checked after `str` and `Mapping`, which are also iterable.
+    Iterable: lambda content: glm.Content(parts=[to_part(part) for part in content]),
+}
+
+
+def to_content(content: ContentType) -> glm.Content:
     if not content:
         raise ValueError("content must not be empty")
 
-    if isinstance(content, Mapping):
-        content = _convert_dict(content)
+    converter = _find_converter(_CONTENT_CONVERTERS, content)
+    if converter is not None:
+        return converter(content)
 
-    if isinstance(content, glm.Content):
-        return content
-    elif isinstance(content, Iterable) and not isinstance(content, str):
-        return glm.Content(parts=[to_part(part) for part in content])
-    else:
-        # Maybe this is a Part?
-        return glm.Content(parts=[to_part(content)])
+    # Maybe this is a Part?
+    return glm.Content(parts=[to_part(content)])
 
 
-def strict_to_content(content: StrictContentType):
+def strict_to_content(content: StrictContentType) -> glm.Content:
+    if type(content) is glm.Content:
+        return content
+
     if isinstance(content, Mapping):
+        if is_content_dict(content):
+            return _content_dict_to_content(content)
         content = _convert_dict(content)
 
     if isinstance(content, glm.Content):
@@ -282,55 +377,101 @@ def strict_to_content(content: StrictContentType):
 ContentsType = Union[ContentType, Iterable[StrictContentType], None]
 
 
+def _is_strict_content(content) -> bool:
+    """Returns True if `strict_to_content` accepts `content`."""
+    if isinstance(content, glm.Content):
+        return True
+    return isinstance(content, Mapping) and is_content_dict(content)
+
+
 def to_contents(contents: ContentsType) -> list[glm.Content]:
     if contents is None:
         return []
 
-    if isinstance(contents, Iterable) and not isinstance(contents, (str, Mapping)):
-        try:
+    if isinstance(contents, list) and all(isinstance(c, glm.Content) for c in contents):
+        # Already converted, e.g. a `ChatSession`'s history.
+        return list(contents)
+
+    if isinstance(contents, list) and contents and all(isinstance(c, str) for c in contents):
+        # The parts of a single message, skip the failed `strict_to_content` attempt below.
+        return [glm.Content(parts=[glm.Part(text=c) for c in contents])]
+
+    if _is_list_like(contents):
+        contents = list(contents)
+        if not contents or _is_strict_content(contents[0]):
             # strict_to_content so [[parts], [parts]] doesn't assume roles.
-            contents = [strict_to_content(c) for c in contents]
-            return contents
-        except TypeError:
-            # If you get a TypeError here it's probably because that was a list
-            # of parts, not a list of contents, so fall back to `to_content`.
-            pass
+            return [strict_to_content(c) for c in contents]
+        # Otherwise it's a list of parts, not a list of contents, so fall through to
+        # `to_content`.
 
     contents = [to_content(contents)]
     return contents
 
 
-def _generate_schema(
-    f: Callable[..., Any],
-    *,
-    descriptions: Mapping[str, str] | None = None,
-    required: Sequence[str] | None = None,
-) -> dict[str, Any]:
-    """Generates the OpenAPI Schema for a python function.
+_PARAMETER_EMPTY = inspect.Parameter.empty
+_SUPPORTED_PARAMETER_KINDS = frozenset(
+    {
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        inspect.Parameter.KEYWORD_ONLY,
+        inspect.Parameter.POSITIONAL_ONLY,
+    }
+)
+
+_SIMPLE_TYPE_NAMES = {int: "integer", float: "number", str: "string", bool: "boolean"}
+
+
+def _annotation_to_schema(annotation) -> dict[str, Any] | None:
+    """Builds the schema pydantic would for the common annotations, or returns `None`."""
+    if annotation is _PARAMETER_EMPTY or annotation is Any:
+        return {}
+    # Only classes are looked up, other annotations (e.g. `Annotated[...]`) may be unhashable.
+    if isinstance(annotation, type) and (type_name := _SIMPLE_TYPE_NAMES.get(annotation)):
+        return {"type": type_name}
+    if annotation is list:
+        return {"items": {}, "type": "array"}
+    if annotation is dict:
+        return {"additionalProperties": True, "type": "object"}
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is list and len(args) == 1:
+        items = _annotation_to_schema(args[0])
+        if items is None:
+            return None
+        return {"items": items, "type": "array"}
+    if origin is dict and args == (str, Any):
+        return {"additionalProperties": True, "type": "object"}
+    return None
+
+
+def _simple_parameters_schema(
+    parameters: Mapping[str, inspect.Parameter], descriptions: Mapping[str, str]
+) -> dict[str, Any] | None:
+    """Builds the parameters schema without pydantic, if every annotation is a common one."""
+    properties = {}
+    for name, param in parameters.items():
+        # We do not support *args or **kwargs
+        if param.kind not in _SUPPORTED_PARAMETER_KINDS:
+            continue
+        schema = _annotation_to_schema(param.annotation)
+        if schema is None:
+            return None
+        if (description := descriptions.get(name, None)) is not None:
+            schema["description"] = description
+        properties[name] = schema
+    return {"properties": properties, "type": "object"}
 
-    Args:
-        f: The function to generate an OpenAPI Schema for.
-        descriptions: Optional. A `{name: description}` mapping for annotating input
-            arguments of the function with user-provided descriptions. It
-            defaults to an empty dictionary (i.e. there will not be any
-            description for any of the inputs).
-        required: Optional. For the user to specify the set of required arguments in
-            function calls to `f`. If unspecified, it will be automatically
-            inferred from `f`.
 
-    Returns:
-        dict[str, Any]: The OpenAPI Schema for the function `f` in JSON format.
-    """
-    if descriptions is None:
-        descriptions = {}
-    if required is None:
-        required = []
-    defaults = dict(inspect.signature(f).parameters)
+def _pydantic_parameters_schema(
+    f: Callable[..., Any],
+    defaults: Mapping[str, inspect.Parameter],
+    descriptions: Mapping[str, str],
+) -> dict[str, Any]:
     fields_dict = {
         name: (
             # 1. We infer the argument type here: use Any rather than None so
             # it will not try to auto-infer the type based on the default value.
-            (param.annotation if param.annotation != inspect.Parameter.empty else Any),
+            (param.annotation if param.annotation is not _PARAMETER_EMPTY else Any),
             pydantic.Field(
                 # 2. We do not support default values for now.
                 # default=(
@@ -343,12 +484,7 @@ def _generate_schema(
         )
         for name, param in defaults.items()
         # We do not support *args or **kwargs
-        if param.kind
-        in (
-            inspect.Parameter.POSITIONAL_OR_KEYWORD,
-            inspect.Parameter.KEYWORD_ONLY,
-            inspect.Parameter.POSITIONAL_ONLY,
-        )
+        if param.kind in _SUPPORTED_PARAMETER_KINDS
     }
     parameters = pydantic.create_model(f.__name__, **fields_dict).schema()
     # Postprocessing
@@ -367,6 +503,38 @@ def _generate_schema(
             annotation
         ):
             function_arg["nullable"] = True
+    return parameters
+
+
+def _generate_schema(
+    f: Callable[..., Any],
+    *,
+    descriptions: Mapping[str, str] | None = None,
+    required: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    """Generates the OpenAPI Schema for a python function.
+
+    Args:
+        f: The function to generate an OpenAPI Schema for.
+        descriptions: Optional. A `{name: description}` mapping for annotating input
+            arguments of the function with user-provided descriptions. It
+            defaults to an empty dictionary (i.e. there will not be any
+            description for any of the inputs).
+        required: Optional. For the user to specify the set of required arguments in
+            function calls to `f`. If unspecified, it will be automatically
+            inferred from `f`.
+
+    Returns:
+        dict[str, Any]: The OpenAPI Schema for the function `f` in JSON format.
+    """
+    if descriptions is None:
+        descriptions = {}
+    if required is None:
+        required = []
+    defaults = dict(inspect.signature(f).parameters)
+    parameters = _simple_parameters_schema(defaults, descriptions)
+    if parameters is None:
+        parameters = _pydantic_parameters_schema(f, defaults, descriptions)
     # 6. Annotate required fields.
     if required:
         # We use the user-provided "required" fields if specified.
@@ -374,48 +542,75 @@ def _generate_schema(
     else:
         # Otherwise we infer it from the function signature.
         parameters["required"] = [
-            k
-            for k in defaults
-            if (
-                defaults[k].default == inspect.Parameter.empty
-                and defaults[k].kind
-                in (
-                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                    inspect.Parameter.KEYWORD_ONLY,
-                    inspect.Parameter.POSITIONAL_ONLY,
-                )
-            )
+            name
+            for name, param in defaults.items()
+            if param.default is _PARAMETER_EMPTY and param.kind in _SUPPORTED_PARAMETER_KINDS
         ]
     schema = dict(name=f.__name__, description=f.__doc__, parameters=parameters)
     return schema
 
 
-def _rename_schema_fields(schema):
+# function -> {descriptions: schema}. Weakly keyed, so functions (e.g. closures built in a loop)
+# aren't kept alive by the cache.
+_SCHEMA_CACHE: weakref.WeakKeyDictionary[
+    Callable[..., Any], dict[tuple[tuple[str, str], ...], dict[str, Any]]
+] = weakref.WeakKeyDictionary()
+
+
+def _generate_schema_cached(
+    f: Callable[..., Any], descriptions: tuple[tuple[str, str], ...]
+) -> dict[str, Any]:
+    """A memoized `_generate_schema`, inspecting the signature (and pydantic) is slow.
+
+    Don't modify the result, it's shared by every caller.
+    """
+    try:
+        schemas = _SCHEMA_CACHE.get(f)
+    except TypeError:
+        # `f` can't be weakly referenced, or isn't hashable.
+        return _generate_schema(f, descriptions=dict(descriptions))
+    if schemas is None:
+        schemas = _SCHEMA_CACHE[f] = {}
+
+    schema = schemas.get(descriptions)
+    if schema is None:
+        schema = schemas[descriptions] = _generate_schema(f, descriptions=dict(descriptions))
+    return schema
+
+
+def _rename_schema_fields(schema: dict[str, Any] | None) -> dict[str, Any] | None:
     if schema is None:
         return schema
 
-    schema = schema.copy()
+    # Copy once up front, then rename in place without recursing.
+    schema = copy.deepcopy(schema)
+    stack = [schema]
+    while stack:
+        node = stack.pop()
 
-    type_ = schema.pop("type", None)
-    if type_ is not None:
-        schema["type_"] = type_.upper()
+        type_ = node.pop("type", None)
+        if type_ is not None:
+            node["type_"] = type_.upper()
 
-    format_ = schema.pop("format", None)
-    if format_ is not None:
-        schema["format_"] = format_
+        format_ = node.pop("format", None)
+        if format_ is not None:
+            node["format_"] = format_
 
-    items = schema.pop("items", None)
-    if items is not None:
-        schema["items"] = _rename_schema_fields(items)
+        items = node.get("items")
+        if items is not None:
+            stack.append(items)
 
-    properties = schema.pop("properties", None)
-    if properties is not None:
-        schema["properties"] = {k: _rename_schema_fields(v) for k, v in properties.items()}
+        properties = node.get("properties")
+        if properties is not None:
+            stack.extend(properties.values())
 
     return schema
 
 
 class FunctionDeclaration:
+    # `__weakref__` so declarations can be held by `_FD_CACHE`.
+    __slots__ = ("_proto", "__weakref__")
+
     def __init__(self, *, name: str, description: str, parameters: dict[str, Any] | None = None):
         """A  class wrapping a `glm.FunctionDeclaration`, describes a function for `genai.GenerativeModel`'s `tools`."""
         self._proto = glm.FunctionDeclaration(
@@ -460,7 +655,11 @@ class FunctionDeclaration:
         if descriptions is None:
             descriptions = {}
 
-        schema = _generate_schema(function, descriptions=descriptions)
+        if isinstance(function, Hashable):
+            # Shared, but `FunctionDeclaration` copies `parameters` before modifying them.
+            schema = _generate_schema_cached(function, tuple(sorted(descriptions.items())))
+        else:
+            schema = _generate_schema(function, descriptions=descriptions)
 
         return CallableFunctionDeclaration(**schema, function=function)
 
@@ -469,12 +668,26 @@ StructType = dict[str, "ValueType"]
 ValueType = Union[float, str, bool, StructType, list["ValueType"], None]
 
 
+def _positional_parameter_names(function: Callable[..., Any]) -> tuple[str, ...] | None:
+    """Returns the parameter names if `function` can take all of them positionally."""
+    try:
+        # Don't follow `__wrapped__`, a decorator's wrapper may only accept keywords.
+        parameters = inspect.signature(function, follow_wrapped=False).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    if all(p.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD for p in parameters):
+        return tuple(p.name for p in parameters)
+    return None
+
+
 class CallableFunctionDeclaration(FunctionDeclaration):
     """An extension of `FunctionDeclaration` that can be built from a python function, and is callable.
 
     Note: The python function must have type annotations.
     """
 
+    __slots__ = ("_function", "_parameter_names")
+
     def __init__(
         self,
         *,
@@ -486,8 +699,25 @@ class CallableFunctionDeclaration(FunctionDeclaration):
         super().__init__(name=name, description=description, parameters=parameters)
         self.function = function
 
+    @property
+    def function(self) -> Callable[..., Any]:
+        return self._function
+
+    @function.setter
+    def function(self, function: Callable[..., Any]):
+        self._function = function
+        self._parameter_names = _positional_parameter_names(function)
+
     def __call__(self, fc: glm.FunctionCall) -> glm.FunctionResponse:
-        result = self.function(**fc.args)
+        args = fc.args
+        names = self._parameter_names
+        if names is not None and len(args) == len(names) and all(name in args for name in names):
+            # Pass the arguments positionally, instead of building a `**kwargs` dict.
+            result = self.function(*[args[name] for name in names])
+        else:
+            result = self.function(**args)
+        # Checked on every call rather than trusting the return annotation: `isinstance` against
+        # a builtin is cheap next to the call itself, and annotations aren't enforced.
         if not isinstance(result, dict):
             result = {"result": result}
         return glm.FunctionResponse(name=fc.name, response=result)
@@ -501,6 +731,22 @@ FunctionDeclarationType = Union[
 ]
 
 
+# id(function) -> declaration. The declaration keeps its function alive, so while an entry exists
+# its id can't be reused by another object.
+_FD_CACHE: weakref.WeakValueDictionary[int, CallableFunctionDeclaration] = (
+    weakref.WeakValueDictionary()
+)
+
+
+def _callable_function_declaration(fun: Callable[..., Any]) -> CallableFunctionDeclaration:
+    """Returns a shared `CallableFunctionDeclaration` for `fun`, while one is still in use."""
+    fd = _FD_CACHE.get(id(fun))
+    if fd is None or fd.function is not fun:
+        fd = CallableFunctionDeclaration.from_function(fun)
+        _FD_CACHE[id(fun)] = fd
+    return fd
+
+
 def _make_function_declaration(
     fun: FunctionDeclarationType,
 ) -> FunctionDeclaration | glm.FunctionDeclaration:
@@ -512,7 +758,7 @@ def _make_function_declaration(
         else:
             return FunctionDeclaration(**fun)
     elif callable(fun):
-        return CallableFunctionDeclaration.from_function(fun)
+        return _callable_function_declaration(fun)
     else:
         raise TypeError(
             "Expected an instance of `genai.FunctionDeclaraionType`. Got a:\n" f"  {type(fun)=}\n",
@@ -527,22 +773,37 @@ def _encode_fd(fd: FunctionDeclaration | glm.FunctionDeclaration) -> glm.Functio
     return fd.to_proto()
 
 
+def _index_declarations(
+    declarations: Iterable[FunctionDeclaration | glm.FunctionDeclaration],
+) -> dict[str, FunctionDeclaration | glm.FunctionDeclaration]:
+    declarations = list(declarations)
+    index = {declaration.name: declaration for declaration in declarations}
+    if len(index) != len(declarations):
+        counts = collections.Counter(declaration.name for declaration in declarations)
+        duplicates = [name for name, count in counts.items() if count > 1]
+        raise ValueError(
+            f"`FunctionDeclaration` names must be unique, got duplicates: {duplicates}"
+        )
+    return index
+
+
 class Tool:
     """A wrapper for `glm.Tool`, Contains a collection of related `FunctionDeclaration` objects."""
 
+    __slots__ = ("_function_declarations", "_index", "_proto")
+
     def __init__(self, function_declarations: Iterable[FunctionDeclarationType]):
         # The main path doesn't use this but is seems useful.
         self._function_declarations = [_make_function_declaration(f) for f in function_declarations]
-        self._index = {}
-        for fd in self._function_declarations:
-            name = fd.name
-            if name in self._index:
-                raise ValueError("")
-            self._index[fd.name] = fd
-
-        self._proto = glm.Tool(
-            function_declarations=[_encode_fd(fd) for fd in self._function_declarations]
+        self._index = _index_declarations(self._function_declarations)
+
+        # Extending the raw protobuf field copies the declarations in a single C-level call, the
+        # proto-plus constructor marshals them one by one.
+        pb = glm.Tool.pb()()
+        pb.function_declarations.extend(
+            glm.FunctionDeclaration.pb(_encode_fd(fd)) for fd in self._function_declarations
         )
+        self._proto = glm.Tool.wrap(pb)
 
     @property
     def function_declarations(self) -> list[FunctionDeclaration | glm.FunctionDeclaration]:
@@ -587,7 +848,7 @@ def _make_tool(tool: ToolType) -> Tool:
         else:
             fd = tool
             return Tool(function_declarations=[glm.FunctionDeclaration(**fd)])
-    elif isinstance(tool, Iterable):
+    elif _is_list_like(tool):
         return Tool(function_declarations=tool)
     else:
         try:
@@ -602,19 +863,14 @@ def _make_tool(tool: ToolType) -> Tool:
 class FunctionLibrary:
     """A container for a set of `Tool` objects, manages lookup and execution of their functions."""
 
+    __slots__ = ("_tools", "_index")
+
     def __init__(self, tools: Iterable[ToolType]):
         tools = _make_tools(tools)
         self._tools = list(tools)
-        self._index = {}
-        for tool in self._tools:
-            for declaration in tool.function_declarations:
-                name = declaration.name
-                if name in self._index:
-                    raise ValueError(
-                        f"A `FunctionDeclaration` named {name} is already defined. "
-                        "Each `FunctionDeclaration` must be uniquely named."
-                    )
-                self._index[declaration.name] = declaration
+        self._index = _index_declarations(
+            itertools.chain.from_iterable(tool.function_declarations for tool in self._tools)
+        )
 
     def __getitem__(
         self, name: str | glm.FunctionCall
@@ -640,7 +896,7 @@ ToolsType = Union[Iterable[ToolType], ToolType]
 
 
 def _make_tools(tools: ToolsType) -> list[Tool]:
-    if isinstance(tools, Iterable) and not isinstance(tools, Mapping):
+    if _is_list_like(tools):
         tools = [_make_tool(t) for t in tools]
         if len(tools) > 1 and all(len(t.function_declarations) == 1 for t in tools):
             # flatten into a single tool.
@@ -688,6 +944,10 @@ FunctionCallingModeType = Union[FunctionCallingMode, str, int]
 
 
 def to_function_calling_mode(x: FunctionCallingModeType) -> FunctionCallingMode:
+    # Enums, ints and lowercase names are found without lowercasing.
+    mode = _FUNCTION_CALLING_MODE.get(x)
+    if mode is not None:
+        return mode
     if isinstance(x, str):
         x = x.lower()
     return _FUNCTION_CALLING_MODE[x]
@@ -702,8 +962,11 @@ FunctionCallingConfigType = Union[FunctionCallingConfigDict, glm.FunctionCalling
 
 
 def to_function_calling_config(obj: FunctionCallingConfigType) -> glm.FunctionCallingConfig:
+    if type(obj) is glm.FunctionCallingConfig:
+        return obj
+
     if isinstance(obj, (FunctionCallingMode, str, int)):
-        obj = {"mode": to_function_calling_mode(obj)}
+        return glm.FunctionCallingConfig(mode=to_function_calling_mode(obj))
 
     return glm.FunctionCallingConfig(obj)
 
@@ -719,9 +982,9 @@ def to_tool_config(obj: ToolConfigType) -> glm.ToolConfig:
     if isinstance(obj, glm.ToolConfig):
         return obj
     elif isinstance(obj, dict):
-        fcc = obj.pop("function_calling_config")
-        fcc = to_function_calling_config(fcc)
-        obj["function_calling_config"] = fcc
+        # Copy, so the caller's dict isn't modified.
+        obj = dict(obj)
+        obj["function_calling_config"] = to_function_calling_config(obj["function_calling_config"])
         return glm.ToolConfig(**obj)
     else:
         raise TypeError(
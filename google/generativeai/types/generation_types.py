@@ -40,6 +40,8 @@ __all__ = [
     "GenerationConfigType",
     "GenerationConfig",
     "GenerateContentResponse",
+    "stream_text",
+    "stream_text_async",
 ]
 
 if sys.version_info < (3, 10):
@@ -565,3 +567,40 @@ class AsyncGenerateContentResponse(BaseGenerateContentResponse):
 
         async for _ in self:
             pass
+
+
+def _chunk_text(chunk: glm.GenerateContentResponse) -> str | None:
+    candidates = chunk.candidates
+    if not candidates:
+        return None
+    parts = candidates[0].content.parts
+    if not parts:
+        return None
+    return parts[0].text
+
+
+def stream_text(chunks: Iterable[glm.GenerateContentResponse]) -> Iterable[str]:
+    """Yields the text of each chunk from `generate_content(..., raw_stream=True)`.
+
+    Chunks without text, like a final chunk that only carries the `finish_reason`, are
+    skipped. Unlike iterating a `GenerateContentResponse` this doesn't check the candidates
+    or collect the full response.
+
+    >>> chunks = model.generate_content('Tell me a story', raw_stream=True)
+    >>> for text in genai.types.stream_text(chunks):
+    ...   print(text, end='')
+    """
+    with rewrite_stream_error():
+        for chunk in chunks:
+            text = _chunk_text(chunk)
+            if text:
+                yield text
+
+
+async def stream_text_async(chunks: AsyncIterable[glm.GenerateContentResponse]):
+    """The async version of `genai.types.stream_text`."""
+    with rewrite_stream_error():
+        async for chunk in chunks:
+            text = _chunk_text(chunk)
+            if text:
+                yield text
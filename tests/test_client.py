@@ -1,8 +1,10 @@
+import asyncio
 import os
 from unittest import mock
 
 from absl.testing import absltest
 from absl.testing import parameterized
+import grpc
 
 from google.api_core import client_options
 import google.ai.generativelanguage as glm
@@ -112,6 +114,61 @@ class ClientTests(parameterized.TestCase):
         text_client.classm()
         self.assertTrue(ClientTests.DummyClient.called_classm)
 
+    @mock.patch.object(glm, "TextServiceAsyncClient", DummyClient)
+    def test_async_pool(self):
+        client.configure(async_pool_size=3)
+
+        pool = client._client_manager.get_default_client("text_async")
+        clients = [pool.generate_text.__self__ for _ in range(4)]
+
+        self.assertLen(set(map(id, clients[:3])), 3)
+        self.assertIs(clients[0], clients[3])
+
+    def test_async_pool_uses_separate_connections(self):
+        peers = []
+
+        def generate_content(request, context):
+            peers.append(context.peer())
+            return glm.GenerateContentResponse.serialize(glm.GenerateContentResponse())
+
+        class Handler(grpc.GenericRpcHandler):
+            def service(self, handler_call_details):
+                return grpc.unary_unary_rpc_method_handler(generate_content)
+
+        async def run():
+            server = grpc.aio.server()
+            server.add_generic_rpc_handlers([Handler()])
+            port = server.add_insecure_port("localhost:0")
+            await server.start()
+            try:
+                client.configure(
+                    api_key="AIzA_pool",
+                    client_options={"api_endpoint": f"localhost:{port}"},
+                    async_pool_size=3,
+                )
+                pool = client.get_default_generative_async_client()
+                for _ in range(3):
+                    await pool.generate_content(glm.GenerateContentRequest(model="models/a"))
+            finally:
+                await server.stop(None)
+
+        # The local server has no TLS, connect to it without credentials.
+        def insecure_channel(target, credentials, **kwargs):
+            return grpc.aio.insecure_channel(target, **kwargs)
+
+        # Not `asyncio.run`, it unsets the current event loop other tests rely on.
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        with mock.patch.object(grpc.aio, "secure_channel", insecure_channel):
+            loop.run_until_complete(run())
+
+        self.assertLen(peers, 3)
+        self.assertLen(set(peers), 3)
+
+    def test_async_pool_size_must_be_positive(self):
+        with self.assertRaisesRegex(ValueError, "async_pool_size"):
+            client.configure(async_pool_size=0)
+
     def test_same_config(self):
         cm1 = client._ClientManager()
         cm1.configure(api_key="abc")
@@ -12,8 +12,16 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
+import gc
+import inspect
 import pathlib
-from typing import Any
+import subprocess
+import sys
+import types
+from typing import Annotated, Any
+import unittest.mock
+import weakref
 
 from absl.testing import absltest
 from absl.testing import parameterized
@@ -49,6 +57,15 @@ class UnitTests(parameterized.TestCase):
         self.assertEqual(blob.mime_type, "image/png")
         self.assertStartsWith(blob.data, b"\x89PNG")
 
+    @parameterized.named_parameters(
+        ["RGBA", PIL.Image.new("RGBA", (4, 4))],
+        ["P", PIL.Image.new("P", (4, 4))],
+    )
+    def test_new_image_with_alpha_or_palette_to_png(self, image):
+        blob = content_types.image_to_blob(image)
+        self.assertEqual(blob.mime_type, "image/png")
+        self.assertStartsWith(blob.data, b"\x89PNG")
+
     @parameterized.named_parameters(
         ["PIL", PIL.Image.open(TEST_JPG_PATH)],
         ["IPython", IPython.display.Image(filename=TEST_JPG_PATH)],
@@ -80,6 +97,17 @@ class UnitTests(parameterized.TestCase):
         self.assertIsInstance(part, glm.Part)
         self.assertEqual(part.text, "Hello world!")
 
+    @parameterized.named_parameters(
+        ["FunctionCall", glm.FunctionCall(name="f"), "function_call"],
+        ["FunctionResponse", glm.FunctionResponse(name="f"), "function_response"],
+        ["FileData", glm.FileData(file_uri="gs://a/b"), "file_data"],
+        ["MappingProxy", types.MappingProxyType({"text": "Hello"}), "text"],
+    )
+    def test_to_part_field(self, example, field):
+        part = content_types.to_part(example)
+        self.assertIsInstance(part, glm.Part)
+        self.assertIn(field, part)
+
     @parameterized.named_parameters(
         ["Image", IPython.display.Image(filename=TEST_PNG_PATH)],
         ["BlobDict", {"mime_type": "image/png", "data": TEST_PNG_DATA}],
@@ -165,6 +193,41 @@ class UnitTests(parameterized.TestCase):
         self.assertIsInstance(part, glm.Part)
         self.assertEqual(part.text, "Hello world!")
 
+    def test_list_of_str_to_contents(self):
+        contents = content_types.to_contents(["Hello", "world!"])
+
+        self.assertLen(contents, 1)
+        self.assertEqual(["Hello", "world!"], [part.text for part in contents[0].parts])
+        self.assertEqual("", contents[0].role)
+
+    def test_generator_of_parts_to_contents(self):
+        contents = content_types.to_contents(p for p in [{"text": "Hello"}, "world!"])
+
+        self.assertLen(contents, 1)
+        self.assertEqual(["Hello", "world!"], [part.text for part in contents[0].parts])
+
+    def test_to_contents_returns_new_list(self):
+        example = [glm.Content(parts=[{"text": "Hello"}]), glm.Content(parts=[{"text": "world!"}])]
+        contents = content_types.to_contents(example)
+
+        self.assertIsNot(example, contents)
+        self.assertEqual(example, contents)
+        self.assertIs(example[0], contents[0])
+
+    def test_image_types(self):
+        self.assertEqual((PIL.Image.Image, IPython.display.Image), content_types._image_types())
+        self.assertIs(content_types._image_types(), content_types._image_types())
+
+    def test_import_skips_image_libraries(self):
+        # `PIL` and `IPython` are slow to import, only use them if the user already has.
+        code = (
+            "import sys, google.generativeai; print('PIL' in sys.modules, 'IPython' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual("False False", result.stdout.strip())
+
     def test_dict_to_content_fails(self):
         with self.assertRaises(KeyError):
             content_types.to_content({"bad": "dict"})
@@ -364,6 +427,106 @@ class UnitTests(parameterized.TestCase):
         self.assertLen(tools, 1)
         self.assertLen(tools[0].function_declarations, 2)
 
+    def test_function_declaration_renames_nested_schema(self):
+        parameters = {
+            "type": "object",
+            "properties": {
+                "tags": {"type": "array", "items": {"type": "string", "format": "enum"}},
+            },
+        }
+        fd = content_types.FunctionDeclaration(
+            name="f", description="Tags things.", parameters=parameters
+        )
+
+        items = fd.to_proto().parameters.properties["tags"].items
+        self.assertEqual(glm.Type.STRING, items.type_)
+        self.assertEqual("enum", items.format_)
+        # The caller's schema is left untouched.
+        self.assertEqual("string", parameters["properties"]["tags"]["items"]["type"])
+
+    def test_function_declarations_are_shared(self):
+        def a():
+            pass
+
+        tool1 = content_types.Tool(function_declarations=[a])
+        tool2 = content_types.Tool(function_declarations=[a])
+        self.assertIs(tool1["a"], tool2["a"])
+        self.assertIs(a, tool1["a"].function)
+
+    @parameterized.named_parameters(
+        ["list", [1], True],
+        ["tuple", (1,), True],
+        ["generator", (i for i in range(1)), True],
+        ["str", "abc", False],
+        ["bytes", b"abc", False],
+        ["dict", {"a": 1}, False],
+        ["mapping_proxy", types.MappingProxyType({"a": 1}), False],
+        ["int", 1, False],
+    )
+    def test_is_list_like(self, obj, expected):
+        self.assertEqual(expected, content_types._is_list_like(obj))
+
+    def test_to_tool_config_leaves_input_unchanged(self):
+        tool_config = {"function_calling_config": "any"}
+        result = content_types.to_tool_config(tool_config)
+
+        self.assertEqual(glm.FunctionCallingConfig.Mode.ANY, result.function_calling_config.mode)
+        self.assertEqual({"function_calling_config": "any"}, tool_config)
+
+    def test_callable_function_declaration_wraps_non_dict_results(self):
+        def as_dict() -> dict:
+            return {"a": 1}
+
+        def mislabeled() -> dict:
+            return 1
+
+        fc = glm.FunctionCall(name="f", args={})
+        response = content_types._make_function_declaration(as_dict)(fc)
+        self.assertEqual({"a": 1}, dict(response.response))
+
+        response = content_types._make_function_declaration(mislabeled)(fc)
+        self.assertEqual({"result": 1}, dict(response.response))
+
+    def test_callable_function_declaration_passes_args(self):
+        def positional(a: int, b: str):
+            return {"a": a, "b": b}
+
+        def keyword_only(a: int, *, b: str = "default"):
+            return {"a": a, "b": b}
+
+        fc = glm.FunctionCall(name="f", args={"b": "x", "a": 1})
+        response = content_types._make_function_declaration(positional)(fc)
+        self.assertEqual({"a": 1, "b": "x"}, dict(response.response))
+
+        response = content_types._make_function_declaration(keyword_only)(fc)
+        self.assertEqual({"a": 1, "b": "x"}, dict(response.response))
+
+        fc = glm.FunctionCall(name="f", args={"a": 1})
+        response = content_types._make_function_declaration(keyword_only)(fc)
+        self.assertEqual({"a": 1, "b": "default"}, dict(response.response))
+
+    def test_callable_function_declaration_decorated(self):
+        def add(a: int, b: int):
+            return a + b
+
+        @functools.wraps(add)
+        def wrapper(**kwargs):
+            return add(**kwargs)
+
+        fc = glm.FunctionCall(name="add", args={"a": 1, "b": 2})
+        response = content_types._make_function_declaration(wrapper)(fc)
+        self.assertEqual({"result": 3}, dict(response.response))
+
+    def test_duplicate_function_names_raise(self):
+        def a():
+            pass
+
+        with self.assertRaisesRegex(ValueError, "duplicates: \\['a'\\]"):
+            content_types.Tool(function_declarations=[a, a])
+
+        with self.assertRaisesRegex(ValueError, "duplicates: \\['a'\\]"):
+            content_types.FunctionLibrary(tools=[[a], [a]])
+
     @parameterized.named_parameters(
         ["int", int, glm.Schema(type=glm.Type.INTEGER)],
         ["float", float, glm.Schema(type=glm.Type.NUMBER)],
@@ -400,6 +563,83 @@ class UnitTests(parameterized.TestCase):
         got = cfd.parameters.properties["a"]
         self.assertEqual(got, expected)
 
+    @parameterized.named_parameters(
+        ["enum", content_types.FunctionCallingMode.ANY],
+        ["int", 2],
+        ["str", "any"],
+        ["upper-str", "MODE_ANY"],
+    )
+    def test_to_function_calling_mode(self, mode):
+        self.assertEqual(
+            content_types.FunctionCallingMode.ANY, content_types.to_function_calling_mode(mode)
+        )
+
+    def test_to_function_calling_mode_fails(self):
+        with self.assertRaises(KeyError):
+            content_types.to_function_calling_mode("sometimes")
+
+    @parameterized.named_parameters(
+        ["int", int],
+        ["bool", bool],
+        ["any", Any],
+        ["list", list],
+        ["list-list-float", list[list[float]]],
+        ["dict", dict],
+        ["dict-str-any", dict[str, Any]],
+    )
+    def test_simple_schema_matches_pydantic(self, annotation):
+        def fun(a: annotation, b: str, *args, c=1, **kwargs):
+            pass
+
+        parameters = dict(inspect.signature(fun).parameters)
+        descriptions = {"b": "A b."}
+        expected = content_types._pydantic_parameters_schema(fun, parameters, descriptions)
+        # `_generate_schema` replaces this.
+        expected.pop("required")
+        self.assertEqual(
+            expected, content_types._simple_parameters_schema(parameters, descriptions)
+        )
+
+    def test_schema_cache_does_not_keep_functions_alive(self):
+        def make_fun():
+            def fun(a: int):
+                """Does something."""
+
+            return fun
+
+        fun = make_fun()
+        content_types.FunctionDeclaration.from_function(fun)
+        ref = weakref.ref(fun)
+        del fun
+        gc.collect()
+
+        self.assertIsNone(ref())
+
+    def test_unhashable_annotation_schema(self):
+        def fun(a: Annotated[int, {"min": 0}]):
+            pass
+
+        schema = content_types._generate_schema(fun)
+        self.assertEqual("integer", schema["parameters"]["properties"]["a"]["type"])
+
+    def test_from_function_caches_schema(self):
+        def fun(a: int):
+            """Does something."""
+
+        with unittest.mock.patch.object(
+            content_types, "_generate_schema", wraps=content_types._generate_schema
+        ) as generate_schema:
+            cfd1 = content_types.FunctionDeclaration.from_function(fun)
+            cfd2 = content_types.FunctionDeclaration.from_function(fun)
+            cfd3 = content_types.FunctionDeclaration.from_function(fun, descriptions={"a": "An a."})
+
+        self.assertEqual(2, generate_schema.call_count)
+        self.assertEqual(cfd1.to_proto(), cfd2.to_proto())
+        # The shared schema isn't modified by building the declarations.
+        cached = content_types._generate_schema_cached(fun, ())
+        self.assertEqual("integer", cached["parameters"]["properties"]["a"]["type"])
+        self.assertEqual("An a.", cfd3.parameters.properties["a"].description)
+
 
 if __name__ == "__main__":
     absltest.main()
@@ -1,6 +1,7 @@
 import collections
 from collections.abc import Iterable
 import copy
+import datetime
 import pathlib
 from typing import Any
 import textwrap
@@ -8,8 +9,10 @@ import unittest.mock
 from absl.testing import absltest
 from absl.testing import parameterized
 import google.ai.generativelanguage as glm
+import google.api_core.exceptions
 from google.generativeai import client as client_lib
 from google.generativeai import generative_models
+from google.generativeai import response_cache
 from google.generativeai.types import content_types
 from google.generativeai.types import generation_types
 
@@ -215,6 +218,33 @@ class CUJTests(parameterized.TestCase):
 
         self.assertEqual(response.text, "".join(chunks))
 
+    def test_payload_size_hint(self):
+        self.client.generate_content = unittest.mock.MagicMock(
+            side_effect=google.api_core.exceptions.InvalidArgument(
+                "Request payload size exceeds the limit: 20971520 bytes."
+            )
+        )
+        model = generative_models.GenerativeModel("gemini-pro")
+
+        with self.assertRaisesRegex(
+            google.api_core.exceptions.InvalidArgument, "genai.upload_file"
+        ):
+            model.generate_content("Hello")
+
+    def test_raw_stream(self):
+        chunks = [
+            simple_response("first"),
+            simple_response(" second"),
+            glm.GenerateContentResponse(),
+        ]
+        self.responses["stream_generate_content"] = [(chunk for chunk in chunks)]
+
+        model = generative_models.GenerativeModel("gemini-pro")
+        response = model.generate_content("Hello", raw_stream=True)
+
+        self.assertEqual(self.observed_requests[0].contents[0].parts[0].text, "Hello")
+        self.assertEqual(["first", " second"], list(generation_types.stream_text(response)))
+
     def test_stream_lookahead(self):
         chunks = ["first", " second", " third"]
         self.responses["stream_generate_content"] = [(simple_response(text) for text in chunks)]
@@ -605,6 +635,53 @@ class CUJTests(parameterized.TestCase):
             self.assertLen(obr.tools, 1)
             self.assertEqual(type(obr.tools[0]).to_dict(obr.tools[0]), tools)
 
+    def test_default_request_reused(self):
+        model = generative_models.GenerativeModel(
+            "gemini-pro", generation_config={"temperature": 0.5}, safety_settings={"danger": "low"}
+        )
+        self.responses["generate_content"] = [simple_response("a"), simple_response("b")]
+
+        model.generate_content("Hello")
+        model.generate_content("World")
+
+        first, second = self.observed_requests
+        self.assertEqual(["Hello"], [c.parts[0].text for c in first.contents])
+        self.assertEqual(["World"], [c.parts[0].text for c in second.contents])
+        self.assertEqual(first.generation_config, second.generation_config)
+        self.assertEqual(first.safety_settings, second.safety_settings)
+        self.assertAlmostEqual(0.5, second.generation_config.temperature)
+
+    def test_chat_uses_default_request(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        self.responses["generate_content"] = [simple_response("a"), simple_response("b")]
+
+        chat = model.start_chat()
+        with unittest.mock.patch.object(
+            model, "_get_request_template", wraps=model._get_request_template
+        ) as get_request_template:
+            chat.send_message("Hello")
+            chat.send_message("World")
+
+        self.assertEqual(2, get_request_template.call_count)
+        self.assertEqual(
+            ["Hello", "a", "World"], [c.parts[0].text for c in self.observed_requests[1].contents]
+        )
+
+    def test_tools_override(self):
+        model = generative_models.GenerativeModel(
+            "gemini-pro",
+            tools=dict(function_declarations=[dict(name="a", description="A")]),
+        )
+        self.responses["generate_content"] = [simple_response("a"), simple_response("b")]
+
+        model.generate_content(
+            "Hello", tools=dict(function_declarations=[dict(name="b", description="B")])
+        )
+        model.generate_content("Hello")
+
+        self.assertEqual("b", self.observed_requests[0].tools[0].function_declarations[0].name)
+        self.assertEqual("a", self.observed_requests[1].tools[0].function_declarations[0].name)
+
     @parameterized.named_parameters(
         ["basic", "Hello"],
         ["list", ["Hello"]],
@@ -893,6 +970,24 @@ class CUJTests(parameterized.TestCase):
         )
         self.assertEqual(expected, result)
 
+    def test_repr_for_chat_is_updated(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        chat = model.start_chat()
+        self.responses["generate_content"] = [simple_response("first")]
+
+        chat.send_message("Hello")
+        self.assertIn("'first'", repr(chat))
+
+        chat.history.append(glm.Content(role="user", parts=[{"text": "appended"}]))
+        self.assertIn("'appended'", repr(chat))
+
+        chat.history[-1] = glm.Content(role="user", parts=[{"text": "edited"}])
+        self.assertIn("'edited'", repr(chat))
+        self.assertNotIn("'appended'", repr(chat))
+
+        chat.rewind()
+        self.assertNotIn("'edited'", repr(chat))
+
     def test_repr_for_incomplete_streaming_chat(self):
         # Multi turn chat
         model = generative_models.GenerativeModel("gemini-pro")
@@ -974,6 +1069,422 @@ class CUJTests(parameterized.TestCase):
 
         self.client.count_tokens.assert_called_once_with(request, **request_options)
 
+    def test_response_cache(self):
+        cache = response_cache.ResponseCache()
+        model = generative_models.GenerativeModel("gemini-pro", cache=cache)
+        self.responses["generate_content"] = [simple_response("world!")]
+
+        response1 = model.generate_content("Hello")
+        response2 = model.generate_content("Hello")
+
+        self.assertLen(self.observed_requests, 1)
+        self.assertLen(cache, 1)
+        self.assertEqual(response1.text, "world!")
+        self.assertEqual(response2.text, "world!")
+        self.assertIsNot(response1.candidates[0], response2.candidates[0])
+
+    def test_response_cache_miss_on_different_request(self):
+        cache = response_cache.ResponseCache()
+        model = generative_models.GenerativeModel("gemini-pro", cache=cache)
+        self.responses["generate_content"] = [simple_response("a"), simple_response("b")]
+
+        model.generate_content("Hello")
+        response = model.generate_content("Hello", generation_config={"temperature": 0.0})
+
+        self.assertLen(self.observed_requests, 2)
+        self.assertEqual(response.text, "b")
+
+    @parameterized.named_parameters(
+        [
+            "blocked_prompt",
+            glm.GenerateContentResponse({"prompt_feedback": {"block_reason": "SAFETY"}}),
+        ],
+        [
+            "safety_stop",
+            glm.GenerateContentResponse(
+                {"candidates": [{"content": {"parts": [{"text": "a"}]}, "finish_reason": "SAFETY"}]}
+            ),
+        ],
+        ["no_candidates", glm.GenerateContentResponse()],
+    )
+    def test_response_cache_skips_failed_responses(self, failed):
+        cache = response_cache.ResponseCache()
+        model = generative_models.GenerativeModel("gemini-pro", cache=cache)
+        self.responses["generate_content"] = [failed, simple_response("world!")]
+
+        model.generate_content("Hello")
+        response = model.generate_content("Hello")
+
+        self.assertLen(self.observed_requests, 2)
+        self.assertEqual(response.text, "world!")
+        self.assertLen(cache, 1)
+
+    def test_response_cache_skips_stream(self):
+        cache = response_cache.ResponseCache()
+        model = generative_models.GenerativeModel("gemini-pro", cache=cache)
+        self.responses["stream_generate_content"] = [
+            [simple_response("world!")],
+            [simple_response("world!")],
+        ]
+
+        for _ in range(2):
+            response = model.generate_content("Hello", stream=True)
+            response.resolve()
+
+        self.assertLen(self.observed_requests, 2)
+        self.assertEmpty(cache)
+
+    def test_set_llm_cache(self):
+        cache = response_cache.ResponseCache()
+        response_cache.set_llm_cache(cache)
+        self.addCleanup(response_cache.set_llm_cache, None)
+
+        self.responses["generate_content"] = [simple_response("world!")]
+        generative_models.GenerativeModel("gemini-pro").generate_content("Hello")
+        response = generative_models.GenerativeModel("gemini-pro").generate_content("Hello")
+
+        self.assertLen(self.observed_requests, 1)
+        self.assertEqual(response.text, "world!")
+
+    def test_chat_semantic_cache(self):
+        vectors = {
+            "What is the capital of France?": [1.0, 0.0],
+            "What's the capital of France?": [0.99, 0.05],
+            "How tall is Mount Everest?": [0.0, 1.0],
+        }
+
+        def embed_content(request, **kwargs):
+            text = request.content.parts[0].text
+            return glm.EmbedContentResponse(embedding={"values": vectors[text]})
+
+        self.client.embed_content = embed_content
+        self.responses["generate_content"] = [simple_response("Paris"), simple_response("8849m")]
+
+        model = generative_models.GenerativeModel("gemini-pro")
+        cache = response_cache.SemanticCache(threshold=0.95)
+
+        response = model.start_chat(semantic_cache=cache).send_message(
+            "What is the capital of France?"
+        )
+        self.assertEqual(response.text, "Paris")
+
+        chat = model.start_chat(semantic_cache=cache)
+        response = chat.send_message("What's the capital of France?")
+        self.assertEqual(response.text, "Paris")
+        response = chat.send_message("How tall is Mount Everest?")
+        self.assertEqual(response.text, "8849m")
+
+        self.assertLen(self.observed_requests, 2)
+        self.assertLen(self.observed_requests[1].contents, 3)
+        self.assertLen(chat.history, 4)
+        self.assertEqual(chat.history[1].parts[0].text, "Paris")
+        self.assertEqual(chat.history[1].role, "model")
+
+    def test_chat_semantic_cache_keyed_on_history(self):
+        self.client.embed_content = lambda request, **kwargs: glm.EmbedContentResponse(
+            embedding={"values": [1.0, 0.0]}
+        )
+        self.responses["generate_content"] = [
+            simple_response("a"),
+            simple_response("b"),
+            simple_response("c"),
+        ]
+        cache = response_cache.SemanticCache()
+        model = generative_models.GenerativeModel("gemini-pro")
+
+        chat = model.start_chat(semantic_cache=cache)
+        self.assertEqual("a", chat.send_message("Hi").text)
+        self.assertEqual("b", chat.send_message("Hi").text)
+
+        history = [{"role": "user", "parts": ["Bye"]}, {"role": "model", "parts": ["c"]}]
+        chat = model.start_chat(semantic_cache=cache, history=history)
+        self.assertEqual("c", chat.send_message("Hi").text)
+
+        # The same history gets the same answer.
+        history = [{"role": "user", "parts": ["Hi"]}, {"role": "model", "parts": ["a"]}]
+        chat = model.start_chat(semantic_cache=cache, history=history)
+        self.assertEqual("b", chat.send_message("Hi").text)
+        self.assertLen(self.observed_requests, 3)
+
+    def test_chat_semantic_cache_scope(self):
+        self.client.embed_content = lambda request, **kwargs: glm.EmbedContentResponse(
+            embedding={"values": [1.0, 0.0]}
+        )
+        self.responses["generate_content"] = [simple_response("a"), simple_response("b")]
+        cache = response_cache.SemanticCache()
+
+        model1 = generative_models.GenerativeModel("gemini-pro", system_instructions="Be terse.")
+        model2 = generative_models.GenerativeModel("gemini-pro", system_instructions="Be verbose.")
+        self.assertEqual("a", model1.start_chat(semantic_cache=cache).send_message("Hi").text)
+        self.assertEqual("b", model2.start_chat(semantic_cache=cache).send_message("Hi").text)
+
+        # Sessions with the same settings share entries.
+        chat = model1.start_chat(semantic_cache=cache)
+        self.assertEqual("a", chat.send_message("Hi").text)
+        self.assertLen(self.observed_requests, 2)
+
+    @parameterized.named_parameters(
+        ["generation_config", {"generation_config": {"temperature": 0.5}}],
+        ["safety_settings", {"safety_settings": {"harassment": "block_none"}}],
+        ["tools", {"tools": [{"name": "f", "description": "A function."}]}],
+        ["tool_config", {"tool_config": {"function_calling_config": "none"}}],
+    )
+    def test_chat_semantic_cache_skipped_with_overrides(self, overrides):
+        embed_content = unittest.mock.MagicMock(
+            return_value=glm.EmbedContentResponse(embedding={"values": [1.0, 0.0]})
+        )
+        self.client.embed_content = embed_content
+        self.responses["generate_content"] = [simple_response("a"), simple_response("b")]
+        cache = response_cache.SemanticCache()
+
+        chat = generative_models.GenerativeModel("gemini-pro").start_chat(semantic_cache=cache)
+        self.assertEqual("a", chat.send_message("Hi").text)
+        self.assertEqual("b", chat.send_message("Hi", **overrides).text)
+
+        self.assertLen(self.observed_requests, 2)
+        embed_content.assert_called_once()
+        self.assertLen(cache, 1)
+
+    def test_chat_semantic_cache_skipped_with_automatic_function_calling(self):
+        embed_content = unittest.mock.MagicMock(
+            return_value=glm.EmbedContentResponse(embedding={"values": [1.0, 0.0]})
+        )
+        self.client.embed_content = embed_content
+        calls = []
+
+        def weather() -> str:
+            """Returns the weather."""
+            calls.append(1)
+            return f"sunny #{len(calls)}"
+
+        function_call = glm.GenerateContentResponse(
+            {
+                "candidates": [
+                    {
+                        "content": {
+                            "role": "model",
+                            "parts": [{"function_call": {"name": "weather", "args": {}}}],
+                        }
+                    }
+                ]
+            }
+        )
+        self.responses["generate_content"] = [
+            function_call,
+            simple_response("sunny #1"),
+            function_call,
+            simple_response("sunny #2"),
+        ]
+        cache = response_cache.SemanticCache()
+
+        model = generative_models.GenerativeModel("gemini-pro", tools=[weather])
+        for text in ["sunny #1", "sunny #2"]:
+            chat = model.start_chat(enable_automatic_function_calling=True, semantic_cache=cache)
+            self.assertEqual(text, chat.send_message("Weather?").text)
+            self.assertLen(chat.history, 4)
+
+        self.assertLen(calls, 2)
+        embed_content.assert_not_called()
+        self.assertEmpty(cache)
+
+    def test_chat_semantic_cache_falls_back_on_error(self):
+        self.client.embed_content = unittest.mock.MagicMock(
+            side_effect=google.api_core.exceptions.ResourceExhausted("Quota exceeded.")
+        )
+        self.responses["generate_content"] = [simple_response("a")]
+        cache = response_cache.SemanticCache()
+
+        chat = generative_models.GenerativeModel("gemini-pro").start_chat(semantic_cache=cache)
+        self.assertEqual("a", chat.send_message("Hi").text)
+
+        self.assertLen(self.observed_requests, 1)
+        self.assertLen(chat.history, 2)
+        self.assertEmpty(cache)
+
+    @parameterized.named_parameters(
+        ["tools", {"tools": [{"name": "f", "description": "A function."}]}],
+        ["tool_config", {"tool_config": {"function_calling_config": "none"}}],
+    )
+    def test_cached_content_rejects_tool_overrides(self, overrides):
+        model = generative_models.GenerativeModel("gemini-pro")
+        with self.assertRaisesRegex(ValueError, "cached_content"):
+            model.generate_content("Hi", cached_content="cachedContents/abc", **overrides)
+        self.assertEmpty(self.observed_requests)
+
+    def _setup_cache_client(self):
+        cache_client = unittest.mock.MagicMock()
+        client_lib._client_manager.clients["cache"] = cache_client
+        self.addCleanup(client_lib._client_manager.clients.pop, "cache")
+
+        def create_cached_content(cached_content, **kwargs):
+            cached_content = glm.CachedContent(cached_content)
+            cached_content.name = "cachedContents/abc"
+            cached_content.expire_time = datetime.datetime.now(
+                datetime.timezone.utc
+            ) + datetime.timedelta(minutes=10)
+            return cached_content
+
+        cache_client.create_cached_content.side_effect = create_cached_content
+        return cache_client
+
+    def test_chat_auto_cache_prefix(self):
+        cache_client = self._setup_cache_client()
+        self.responses["generate_content"] = [
+            glm.GenerateContentResponse(
+                {
+                    "candidates": [{"content": {"parts": [{"text": text}]}}],
+                    "usage_metadata": {"total_token_count": 40000},
+                }
+            )
+            for text in ["a", "b", "c"]
+        ]
+
+        model = generative_models.GenerativeModel(
+            "gemini-pro", system_instructions="Be brief.", tools=[{"name": "datetime"}]
+        )
+        chat = model.start_chat(auto_cache_prefix=True)
+        chat.send_message("first")
+        chat.send_message("second")
+        chat.send_message("third")
+
+        cache_client.create_cached_content.assert_called_once()
+        cached = cache_client.create_cached_content.call_args.kwargs["cached_content"]
+        self.assertLen(cached.contents, 2)
+        self.assertEqual(cached.system_instruction.parts[0].text, "Be brief.")
+        self.assertLen(cached.tools, 1)
+
+        self.assertLen(self.observed_requests[0].contents, 1)
+        self.assertEqual(self.observed_requests[0].cached_content, "")
+
+        for request, text in zip(self.observed_requests[1:], ["second", "third"]):
+            self.assertEqual(request.cached_content, "cachedContents/abc")
+            self.assertEmpty(request.tools)
+            self.assertEqual(request.contents[-1].parts[0].text, text)
+        self.assertLen(self.observed_requests[1].contents, 1)
+        self.assertLen(self.observed_requests[2].contents, 3)
+        self.assertLen(chat.history, 6)
+
+        chat.rewind()
+        chat.rewind()
+        cache_client.delete_cached_content.assert_not_called()
+        chat.rewind()
+        cache_client.delete_cached_content.assert_called_once_with(name="cachedContents/abc")
+
+    def test_chat_auto_cache_prefix_falls_back_on_error(self):
+        cache_client = self._setup_cache_client()
+        cache_client.create_cached_content.side_effect = (
+            google.api_core.exceptions.PermissionDenied("No caching for you.")
+        )
+        self.responses["generate_content"] = [
+            glm.GenerateContentResponse(
+                {
+                    "candidates": [{"content": {"parts": [{"text": text}]}}],
+                    "usage_metadata": {"total_token_count": 40000},
+                }
+            )
+            for text in ["a", "b"]
+        ]
+
+        chat = generative_models.GenerativeModel("gemini-pro").start_chat(auto_cache_prefix=True)
+        chat.send_message("first")
+        response = chat.send_message("second")
+
+        self.assertEqual("b", response.text)
+        cache_client.create_cached_content.assert_called_once()
+        self.assertEqual(self.observed_requests[1].cached_content, "")
+        self.assertLen(self.observed_requests[1].contents, 3)
+
+    def test_chat_auto_cache_prefix_skipped_on_semantic_hit(self):
+        cache_client = self._setup_cache_client()
+        self.client.embed_content = lambda request, **kwargs: glm.EmbedContentResponse(
+            embedding={"values": [1.0, 0.0]}
+        )
+        self.responses["generate_content"] = [
+            glm.GenerateContentResponse(
+                {
+                    "candidates": [{"content": {"parts": [{"text": "a"}]}}],
+                    "usage_metadata": {"total_token_count": 40000},
+                }
+            )
+        ]
+
+        model = generative_models.GenerativeModel("gemini-pro")
+        cache = response_cache.SemanticCache()
+        model.start_chat(auto_cache_prefix=True, semantic_cache=cache).send_message("Hi")
+        chat = model.start_chat(auto_cache_prefix=True, semantic_cache=cache)
+        self.assertEqual("a", chat.send_message("Hi").text)
+
+        self.assertLen(self.observed_requests, 1)
+        cache_client.create_cached_content.assert_not_called()
+
+    def test_chat_auto_cache_prefix_short_history(self):
+        cache_client = self._setup_cache_client()
+        self.responses["generate_content"] = [simple_response("a"), simple_response("b")]
+
+        chat = generative_models.GenerativeModel("gemini-pro").start_chat(auto_cache_prefix=True)
+        chat.send_message("first")
+        chat.send_message("second")
+
+        cache_client.create_cached_content.assert_not_called()
+        self.assertLen(self.observed_requests[1].contents, 3)
+
+    def test_generate_content_batch(self):
+        def generate_content(request, **kwargs):
+            self.observed_requests.append(request)
+            return simple_response(request.contents[0].parts[0].text.upper())
+
+        self.client.generate_content = generate_content
+
+        model = generative_models.GenerativeModel("gemini-pro")
+        prompts = [f"prompt {n}" for n in range(20)]
+        responses = model.generate_content_batch(prompts, max_concurrency=4)
+
+        self.assertLen(self.observed_requests, 20)
+        self.assertEqual([r.text for r in responses], [p.upper() for p in prompts])
+
+    def test_chat_automatic_function_calling(self):
+        def add(a: int, b: int) -> int:
+            """Adds two numbers."""
+            return a + b
+
+        self.responses["generate_content"] = [
+            simple_response("hi"),
+            glm.GenerateContentResponse(
+                {
+                    "candidates": [
+                        {
+                            "content": {
+                                "role": "model",
+                                "parts": [
+                                    {"function_call": {"name": "add", "args": {"a": 1, "b": 2}}}
+                                ],
+                            }
+                        }
+                    ]
+                }
+            ),
+            simple_response("3"),
+        ]
+
+        model = generative_models.GenerativeModel("gemini-pro", tools=[add])
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        chat.send_message("hello")
+        response = chat.send_message("What is 1 + 2?")
+
+        self.assertEqual(response.text, "3")
+        self.assertLen(self.observed_requests[1].contents, 3)
+        self.assertLen(self.observed_requests[2].contents, 5)
+        self.assertEqual(
+            self.observed_requests[2].contents[-1].parts[0].function_response.response["result"],
+            3,
+        )
+
+        history = chat.history
+        self.assertLen(history, 6)
+        self.assertEqual([c.role for c in history], ["user", "model"] * 3)
+        self.assertEqual(history[2].parts[0].text, "What is 1 + 2?")
+        self.assertEqual(history[-1].parts[0].text, "3")
+
 
 if __name__ == "__main__":
     absltest.main()
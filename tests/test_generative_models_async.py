@@ -13,14 +13,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import collections
 import sys
 from collections.abc import Iterable
 import os
+import threading
 from typing import Any
 import unittest
 
 
+from google.generativeai import batching
 from google.generativeai import client as client_lib
 from google.generativeai import generative_models
 import google.ai.generativelanguage as glm
@@ -162,6 +165,116 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
 
         self.client.count_tokens.assert_called_once_with(request, **request_options)
 
+    async def test_generate_content_batch(self):
+        async def generate_content(request, **kwargs):
+            self.observed_requests.append(request)
+            return simple_response(request.contents[0].parts[0].text.upper())
+
+        self.client.generate_content = generate_content
+
+        model = generative_models.GenerativeModel("gemini-pro")
+        prompts = [f"prompt {n}" for n in range(20)]
+        responses = await model.generate_content_batch_async(prompts, max_concurrency=4)
+
+        self.assertLen(self.observed_requests, 20)
+        self.assertEqual([r.text for r in responses], [p.upper() for p in prompts])
+
+    async def test_batcher_coalesces_identical_requests(self):
+        async def generate_content(request, **kwargs):
+            self.observed_requests.append(request)
+            return simple_response(request.contents[0].parts[0].text.upper())
+
+        self.client.generate_content = generate_content
+
+        model = generative_models.GenerativeModel("gemini-pro", batcher=batching.AsyncBatcher())
+        prompts = ["a", "b", "a", "a", "c"]
+        responses = await asyncio.gather(*[model.generate_content_async(p) for p in prompts])
+
+        self.assertEqual([r.text for r in responses], ["A", "B", "A", "A", "C"])
+        self.assertLen(self.observed_requests, 3)
+        self.assertIsNot(responses[0].candidates[0], responses[2].candidates[0])
+
+    async def test_batcher_propagates_errors(self):
+        async def generate_content(request, **kwargs):
+            raise ValueError("boom")
+
+        self.client.generate_content = generate_content
+
+        model = generative_models.GenerativeModel("gemini-pro", batcher=batching.AsyncBatcher())
+        results = await asyncio.gather(
+            model.generate_content_async("a"),
+            model.generate_content_async("a"),
+            return_exceptions=True,
+        )
+
+        self.assertLen(results, 2)
+        for result in results:
+            self.assertIsInstance(result, ValueError)
+
+    async def test_chat_automatic_function_calling_runs_calls_concurrently(self):
+        # Both calls have to be running at once to pass the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def double(x: int) -> int:
+            """Doubles a number."""
+            barrier.wait()
+            return 2 * x
+
+        function_calls = [{"function_call": {"name": "double", "args": {"x": x}}} for x in (1, 2)]
+        self.responses["generate_content"] = [
+            glm.GenerateContentResponse(
+                {"candidates": [{"content": {"role": "model", "parts": function_calls}}]}
+            ),
+            simple_response("2 and 4"),
+        ]
+
+        model = generative_models.GenerativeModel("gemini-pro", tools=[double])
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = await chat.send_message_async("Double 1 and 2")
+
+        self.assertEqual(response.text, "2 and 4")
+        parts = self.observed_requests[1].contents[-1].parts
+        self.assertEqual([2, 4], [part.function_response.response["result"] for part in parts])
+
+    async def test_chat_automatic_function_calling_runs_single_call_in_thread(self):
+        threads = []
+
+        def record_thread(label: str) -> str:
+            """Records the thread it runs in."""
+            threads.append(threading.current_thread())
+            return "done"
+
+        self.responses["generate_content"] = [
+            glm.GenerateContentResponse(
+                {
+                    "candidates": [
+                        {
+                            "content": {
+                                "role": "model",
+                                "parts": [
+                                    {
+                                        "function_call": {
+                                            "name": "record_thread",
+                                            "args": {"label": "a"},
+                                        }
+                                    }
+                                ],
+                            }
+                        }
+                    ]
+                }
+            ),
+            simple_response("done"),
+        ]
+
+        model = generative_models.GenerativeModel("gemini-pro", tools=[record_thread])
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = await chat.send_message_async("Go")
+
+        self.assertEqual(response.text, "done")
+        self.assertLen(threads, 1)
+        self.assertIsNot(threading.main_thread(), threads[0])
+
 
 if __name__ == "__main__":
     absltest.main()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest.mock
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+import google.ai.generativelanguage as glm
+from google.generativeai import client as client_lib
+from google.generativeai import response_cache
+
+
+def simple_response(text: str) -> glm.GenerateContentResponse:
+    return glm.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+
+def simple_request(text: str, **kwargs) -> glm.GenerateContentRequest:
+    return glm.GenerateContentRequest(
+        model="models/gemini-pro", contents=[{"parts": [{"text": text}]}], **kwargs
+    )
+
+
+class ResponseCacheTests(parameterized.TestCase):
+    def test_request_key_is_stable(self):
+        key1 = response_cache.request_key(simple_request("hello"))
+        key2 = response_cache.request_key(simple_request("hello"))
+        key3 = response_cache.request_key(simple_request("goodbye"))
+
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+
+    def test_request_key_includes_model(self):
+        request = simple_request("hello")
+        key1 = response_cache.request_key(request)
+        request.model = "models/gemini-ultra"
+        key2 = response_cache.request_key(request)
+
+        self.assertNotEqual(key1, key2)
+
+    def test_request_key_includes_blobs(self):
+        def blob_request(data):
+            return glm.GenerateContentRequest(
+                model="models/gemini-pro",
+                contents=[{"parts": [{"inline_data": {"mime_type": "image/png", "data": data}}]}],
+            )
+
+        key1 = response_cache.request_key(blob_request(b"PNG" * 1000 + b"1"))
+        key2 = response_cache.request_key(blob_request(b"PNG" * 1000 + b"1"))
+        key3 = response_cache.request_key(blob_request(b"PNG" * 1000 + b"2"))
+
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+
+    def test_request_key_separates_contents(self):
+        request1 = glm.GenerateContentRequest(contents=[{"parts": [{"text": "a"}, {"text": "b"}]}])
+        request2 = glm.GenerateContentRequest(
+            contents=[{"parts": [{"text": "a"}]}, {"parts": [{"text": "b"}]}]
+        )
+
+        self.assertNotEqual(
+            response_cache.request_key(request1), response_cache.request_key(request2)
+        )
+
+    def test_contents_key(self):
+        def contents(*roles):
+            return [glm.Content(role=role, parts=[{"text": "a"}]) for role in roles]
+
+        self.assertEqual(
+            response_cache.contents_key(contents("user", "model")),
+            response_cache.contents_key(contents("user", "model")),
+        )
+        self.assertNotEqual(
+            response_cache.contents_key(contents("user", "model")),
+            response_cache.contents_key(contents("user", "user")),
+        )
+        self.assertNotEqual(
+            response_cache.contents_key([]), response_cache.contents_key(contents("user"))
+        )
+
+    @parameterized.named_parameters(
+        ["default", {}, True],
+        ["greedy", {"temperature": 0.0, "candidate_count": 2}, True],
+        ["one_sample", {"temperature": 0.7, "candidate_count": 1}, True],
+        ["many_samples", {"temperature": 0.7, "candidate_count": 2}, False],
+    )
+    def test_is_cacheable(self, generation_config, expected):
+        request = simple_request("hello", generation_config=generation_config)
+        self.assertEqual(expected, response_cache.is_cacheable(request))
+
+    def test_get_returns_copy(self):
+        cache = response_cache.ResponseCache()
+        cache.put(b"key", simple_response("hello"))
+
+        first = cache.get(b"key")
+        first.candidates[0].content.role = "model"
+        second = cache.get(b"key")
+
+        self.assertEqual(second.candidates[0].content.parts[0].text, "hello")
+        self.assertEqual(second.candidates[0].content.role, "")
+
+    def test_lru_eviction(self):
+        cache = response_cache.ResponseCache(max_entries=2)
+        cache.put(b"a", simple_response("a"))
+        cache.put(b"b", simple_response("b"))
+        cache.get(b"a")
+        cache.put(b"c", simple_response("c"))
+
+        self.assertLen(cache, 2)
+        self.assertIsNotNone(cache.get(b"a"))
+        self.assertIsNone(cache.get(b"b"))
+        self.assertIsNotNone(cache.get(b"c"))
+
+    def test_ttl(self):
+        cache = response_cache.ResponseCache(ttl=10)
+        with unittest.mock.patch.object(response_cache.time, "monotonic", return_value=100.0):
+            cache.put(b"a", simple_response("a"))
+        with unittest.mock.patch.object(response_cache.time, "monotonic", return_value=105.0):
+            self.assertIsNotNone(cache.get(b"a"))
+        with unittest.mock.patch.object(response_cache.time, "monotonic", return_value=111.0):
+            self.assertIsNone(cache.get(b"a"))
+        self.assertEmpty(cache)
+
+    def test_bad_max_entries(self):
+        with self.assertRaises(ValueError):
+            response_cache.ResponseCache(max_entries=0)
+
+
+class SemanticCacheTests(parameterized.TestCase):
+    def setUp(self):
+        self.client = unittest.mock.MagicMock()
+        client_lib._client_manager.clients["generative"] = self.client
+
+        def embed_content(request, **kwargs):
+            values = [float(x) for x in request.content.parts[0].text.split(",")]
+            return glm.EmbedContentResponse(embedding={"values": values})
+
+        self.client.embed_content = embed_content
+
+    def test_lookup_hit_and_miss(self):
+        cache = response_cache.SemanticCache(threshold=0.9)
+
+        vector, cached = cache.lookup(glm.Content(parts=[{"text": "3,4"}]))
+        self.assertIsNone(cached)
+        self.assertSequenceAlmostEqual([0.6, 0.8], vector)
+        cache.add(vector, simple_response("hello"))
+
+        _, cached = cache.lookup(glm.Content(parts=[{"text": "6,8.1"}]))
+        self.assertEqual(cached.candidates[0].content.parts[0].text, "hello")
+
+        _, cached = cache.lookup(glm.Content(parts=[{"text": "-4,3"}]))
+        self.assertIsNone(cached)
+
+    def test_lookup_skips_multipart(self):
+        cache = response_cache.SemanticCache()
+        vector, cached = cache.lookup(glm.Content(parts=[{"text": "1,0"}, {"text": "0,1"}]))
+        self.assertIsNone(vector)
+        self.assertIsNone(cached)
+
+    def test_lookup_scope(self):
+        cache = response_cache.SemanticCache()
+        cache.add([1.0, 0.0], simple_response("a"), scope="a")
+
+        _, cached = cache.lookup(glm.Content(parts=[{"text": "1,0"}]), scope="b")
+        self.assertIsNone(cached)
+        _, cached = cache.lookup(glm.Content(parts=[{"text": "1,0"}]), scope="a")
+        self.assertEqual(cached.candidates[0].content.parts[0].text, "a")
+
+    def test_eviction(self):
+        cache = response_cache.SemanticCache(max_entries=1)
+        cache.add([1.0, 0.0], simple_response("a"))
+        cache.add([0.0, 1.0], simple_response("b"))
+
+        self.assertLen(cache, 1)
+        _, cached = cache.lookup(glm.Content(parts=[{"text": "1,0"}]))
+        self.assertIsNone(cached)
+
+
+if __name__ == "__main__":
+    absltest.main()